@@ -0,0 +1,252 @@
+import time
+import asyncio
+import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+
+class HablaAsincrona:
+    """Sustituto de SistemaTTS que encola el texto para la tarea de voz"""
+
+    def __init__(self, aplicacion, tts):
+        self.aplicacion = aplicacion
+        self.tts = tts
+        self.comando_tts = tts.comando_tts
+
+    def decir_texto(self, texto):
+        if not self.comando_tts:
+            print("No se encontró un comando de TTS compatible en este sistema")
+            return False
+        self.aplicacion.publicar(self.aplicacion.habla, texto, "habla")
+        return True
+
+
+class AplicacionAsincrona:
+    """Bucle de una pantalla sobre asyncio, alternativo al bucle bloqueante de ejecutar()
+
+    Seguimiento de la cámara, eventos de pygame y fin de cada frase llegan por colas
+    acotadas: si el consumidor se atrasa se descarta el elemento más viejo y se cuenta.
+    Las llamadas a la cámara (lectura, inferencia, calibración) corren en un único
+    hilo ejecutor, la voz en subprocesos asíncronos y el dibujo es una tarea periódica.
+    La pantalla debe exponer manejar_eventos, actualizar_clic, _actualizar_reposo,
+    dibujar_interfaz, usuario_cambiado y finalizar, y llamar a la cámara desde los
+    eventos con llamar_camara, como Inicio.
+    """
+
+    def __init__(self, pantalla, fps=60, intervalo_eventos_reposo=0.1, max_habla=4):
+        self.pantalla = pantalla
+        self.fps = fps
+        self.intervalo_eventos_reposo = intervalo_eventos_reposo
+        self.max_habla = max_habla
+
+        # El hilo de cámara se crea en cada ejecución y se cierra al terminarla
+        self.ejecutor_camara = None
+        self.tareas_camara = set()
+        self.descartes = Counter()
+        self.contadores = Counter()
+        self.ejecutando = False
+
+    def publicar(self, cola, elemento, nombre):
+        """Pone un elemento en una cola acotada descartando el más viejo si está llena"""
+        if cola.full():
+            cola.get_nowait()
+            self.descartes[nombre] += 1
+        cola.put_nowait(elemento)
+        self.despertar.set()
+
+    @staticmethod
+    async def flujo(cola):
+        """Recorre una cola como flujo asíncrono"""
+        while True:
+            yield await cola.get()
+
+    async def en_camara(self, funcion, *args):
+        """Ejecuta una llamada bloqueante de la cámara en su hilo, p. ej. calibrar"""
+        bucle = asyncio.get_running_loop()
+        return await bucle.run_in_executor(self.ejecutor_camara, funcion, *args)
+
+    def _programar_en_camara(self, funcion, al_terminar=None):
+        """Versión de llamar_camara para la pantalla: no bloquea el dibujo"""
+        async def llamar():
+            try:
+                await self.en_camara(funcion)
+            except Exception as e:
+                print(f"Error cámara: {e}")
+                return
+            if al_terminar:
+                al_terminar()
+
+        tarea = asyncio.create_task(llamar())
+        self.tareas_camara.add(tarea)
+        tarea.add_done_callback(self.tareas_camara.discard)
+
+    def _leer_camara(self):
+        camara = self.pantalla.camara
+        cursor_x, cursor_y, clic = camara.obtener_posicion_y_clic()
+        return cursor_x, cursor_y, clic, camara.inactividad == 0
+
+    async def _seguir(self):
+        """Tarea de seguimiento: publica la última posición y clic de la cámara"""
+        while self.ejecutando:
+            try:
+                muestra = await self.en_camara(self._leer_camara)
+            except Exception as e:
+                print(f"Error cámara: {e}")
+                muestra = (None, None, False, False)
+            self.contadores["muestras"] += 1
+            self.publicar(self.seguimiento, muestra, "seguimiento")
+
+            # En reposo la cámara sólo se consulta cada intervalo_sondeo_reposo segundos
+            if self.pantalla.en_reposo:
+                await asyncio.sleep(self.pantalla.intervalo_sondeo_reposo)
+            elif muestra[0] is None:
+                await asyncio.sleep(1 / self.fps)  # Sin cámara: no girar en vacío
+            else:
+                await asyncio.sleep(0)
+
+    async def _recibir_eventos(self):
+        """Tarea de eventos: pygame sólo se consulta desde el hilo principal"""
+        while self.ejecutando:
+            eventos = pygame.event.get()
+            if eventos:
+                self.publicar(self.eventos, eventos, "eventos")
+            intervalo = self.intervalo_eventos_reposo if self.pantalla.en_reposo else 1 / self.fps
+            await asyncio.sleep(intervalo)
+
+    async def _hablar(self):
+        """Tarea de voz: dice las frases en orden sin bloquear el dibujo"""
+        async for texto in self.flujo(self.habla):
+            comando = self.tts.comando(texto)
+            inicio = time.perf_counter()
+            try:
+                proceso = await asyncio.create_subprocess_exec(*comando, stdout=subprocess.DEVNULL,
+                                                               stderr=subprocess.DEVNULL)
+            except OSError as e:
+                print(f"Error al usar TTS: {e}")
+                continue
+            try:
+                codigo = await proceso.wait()
+            except asyncio.CancelledError:
+                proceso.terminate()
+                raise
+            self.publicar(self.habla_terminada, (texto, codigo, time.perf_counter() - inicio), "habla_terminada")
+
+    async def _registrar_habla(self):
+        """Consume el fin de cada frase y lo anota en el registro de uso"""
+        async for texto, codigo, duracion in self.flujo(self.habla_terminada):
+            self.pantalla.registro.registrar("habla", caracteres=len(texto), codigo=codigo,
+                                             duracion=round(duracion, 2))
+
+    @staticmethod
+    def _vaciar(cola):
+        elementos = []
+        while not cola.empty():
+            elementos.append(cola.get_nowait())
+        return elementos
+
+    async def _dibujar(self):
+        """Tarea periódica de dibujo; en reposo espera a que llegue algo nuevo"""
+        pantalla = self.pantalla
+        bucle = asyncio.get_running_loop()
+        periodo = 1 / self.fps
+        siguiente = bucle.time()
+
+        while self.ejecutando and pantalla.activa:
+            pantalla.monitor_energia.registrar(pantalla.en_reposo)
+            self.despertar.clear()
+
+            eventos = [evento for lote in self._vaciar(self.eventos) for evento in lote]
+            if not pantalla.manejar_eventos(eventos):
+                self.ejecutando = False
+                break
+
+            # El clic sólo cuenta en marcos con una muestra nueva de la cámara
+            muestras = self._vaciar(self.seguimiento)
+            if muestras:
+                self.muestra = muestras[-1]
+            cursor_x, cursor_y, clic, detectado = self.muestra
+            if cursor_x is None:
+                cursor_x, cursor_y = pygame.mouse.get_pos()
+                clic = pygame.mouse.get_pressed()[0]
+            clic_activo = pantalla.actualizar_clic(clic) if muestras else False
+            if time.time() < pantalla.clics_bloqueados_hasta:
+                clic_activo = False
+            detectado = detectado and bool(muestras)
+
+            cambio_estado = pantalla._actualizar_reposo(detectado, eventos)
+            if not pantalla.en_reposo or eventos or cambio_estado:
+                pantalla.dibujar_interfaz(cursor_x, cursor_y, clic_activo)
+                pygame.display.flip()
+                self.contadores["marcos"] += 1
+
+            if pantalla.en_reposo:
+                try:
+                    await asyncio.wait_for(self.despertar.wait(), pantalla.intervalo_sondeo_reposo)
+                except asyncio.TimeoutError:
+                    pass
+                siguiente = bucle.time()
+            else:
+                siguiente += periodo
+                espera = siguiente - bucle.time()
+                if espera < 0:
+                    # Atrasado: no acumular marcos perdidos
+                    siguiente = bucle.time()
+                    espera = 0
+                await asyncio.sleep(espera)
+
+    async def ejecutar(self):
+        """Ejecuta la pantalla hasta salir o hasta que otra pantalla la reemplace"""
+        pantalla = self.pantalla
+        pygame.display.set_caption("SIMUS.MJN - Comunicación Aumentativa")
+
+        self.seguimiento = asyncio.Queue(maxsize=1)
+        self.eventos = asyncio.Queue(maxsize=64)
+        self.habla = asyncio.Queue(maxsize=self.max_habla)
+        self.habla_terminada = asyncio.Queue(maxsize=16)
+        self.despertar = asyncio.Event()
+        self.muestra = (None, None, False, False)
+        self.ejecutor_camara = ThreadPoolExecutor(max_workers=1)
+        self.descartes.clear()
+        self.contadores.clear()
+
+        # La pantalla no debe bloquear el bucle ni lanzar procesos de voz por su cuenta
+        self.tts = pantalla.tts_sistema
+        pantalla.tts_sistema = HablaAsincrona(self, self.tts)
+        pausa_bloqueante = pantalla.pausa_bloqueante
+        pantalla.pausa_bloqueante = False
+        pantalla.programar_camara = self._programar_en_camara
+
+        self.ejecutando = True
+        pantalla.activa = True
+        pantalla.usuario_cambiado()  # Otra pantalla pudo cambiar el usuario de la cámara compartida
+        inicio = time.perf_counter()
+        tareas = [asyncio.create_task(self._seguir()),
+                  asyncio.create_task(self._recibir_eventos()),
+                  asyncio.create_task(self._hablar()),
+                  asyncio.create_task(self._registrar_habla())]
+        try:
+            await self._dibujar()
+        finally:
+            self.ejecutando = False
+            for tarea in tareas:
+                tarea.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+            # Dejar terminar los cambios de usuario en curso antes de cerrar el hilo de cámara
+            await asyncio.gather(*self.tareas_camara, return_exceptions=True)
+            self.ejecutor_camara.shutdown(wait=True)
+
+            pantalla.tts_sistema = self.tts
+            pantalla.pausa_bloqueante = pausa_bloqueante
+            pantalla.programar_camara = None
+            self.imprimir_metricas(time.perf_counter() - inicio)
+            pantalla.finalizar()
+
+    def imprimir_metricas(self, duracion):
+        if duracion <= 0:
+            return
+        print(f"📊 Bucle asíncrono: {self.contadores['marcos'] / duracion:.1f} marcos/s, "
+              f"{self.contadores['muestras'] / duracion:.1f} muestras/s de cámara")
+        if self.descartes:
+            print("🗑️ Descartados por cola llena: " +
+                  ", ".join(f"{nombre} {n}" for nombre, n in self.descartes.items()))
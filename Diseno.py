@@ -0,0 +1,169 @@
+import sys
+import time
+from functools import lru_cache
+import pygame
+
+
+# Diseño declarativo de la pantalla de inicio; las medidas son fracciones del tamaño disponible
+DISENO_INICIO = {
+    "margen": 0.025,          # del lado menor de la pantalla
+    "alto_barra": 0.13,       # del alto de la pantalla
+    "ancho_tira": 0.2,        # del ancho de la pantalla
+    "categorias": {"filas": 2, "columnas": 3, "espacio": 0.04},
+    "celdas": {"filas": 2, "columnas": 3, "espacio": 0.05, "alto_titulo": 0.16, "alto_texto": 0.2},
+    "barra": {"botones": 6, "alto_boton": 0.84, "proporcion": 1.2},
+    "tira": {"alto_titulo": 0.07, "alto_simbolos": 0.2, "alto_etiqueta": 0.06,
+             "sugerencias": {"filas": 2, "columnas": 2}, "alto_botones": 0.1},
+}
+
+
+def dividir(rect, filas, columnas, espacio=0):
+    """Divide un rectángulo en una grilla de filas x columnas separadas por espacio píxeles"""
+    ancho = (rect.width - espacio * (columnas - 1)) / columnas
+    alto = (rect.height - espacio * (filas - 1)) / filas
+    return [
+        pygame.Rect(round(rect.x + c * (ancho + espacio)), round(rect.y + f * (alto + espacio)),
+                    round(ancho), round(alto))
+        for f in range(filas) for c in range(columnas)
+    ]
+
+
+def _cuadrado_centrado(rect, lado, arriba=False):
+    cuadrado = pygame.Rect(0, 0, lado, lado)
+    cuadrado.centerx = rect.centerx
+    if arriba:
+        cuadrado.top = rect.top
+    else:
+        cuadrado.centery = rect.centery
+    return cuadrado
+
+
+class Geometria:
+    """Rectángulos y tamaños de la pantalla de inicio para una resolución
+
+    Se comparte entre dibujo y detección de clics, así que sus Rect no deben modificarse.
+    """
+
+    def __init__(self, ancho, alto, diseno=DISENO_INICIO):
+        self.ancho = ancho
+        self.alto = alto
+
+        margen = round(diseno["margen"] * min(ancho, alto))
+        alto_barra = round(diseno["alto_barra"] * alto)
+        ancho_tira = round(diseno["ancho_tira"] * ancho)
+        alto_contenido = alto - alto_barra - 2 * margen
+
+        # Regiones principales
+        self.tira = pygame.Rect(ancho - margen - ancho_tira, margen, ancho_tira, alto_contenido)
+        self.principal = pygame.Rect(margen, margen, self.tira.x - 2 * margen, alto_contenido)
+        self.barra = pygame.Rect(0, alto - alto_barra, ancho, alto_barra)
+        self.radio_principal = margen * 2
+
+        # Cuadros de categoría y sus celdas
+        d = diseno["categorias"]
+        interior = self.principal.inflate(-2 * margen, -2 * margen)
+        espacio = round(d["espacio"] * min(interior.width, interior.height))
+        self.cuadros = dividir(interior, d["filas"], d["columnas"], espacio)
+
+        d = diseno["celdas"]
+        self.celdas = []
+        self.flechas = []
+        self.centros_titulo = []
+        lado_celda = None
+        for cuadro in self.cuadros:
+            alto_titulo = round(d["alto_titulo"] * cuadro.height)
+            area = pygame.Rect(cuadro.x, cuadro.y + alto_titulo, cuadro.width, cuadro.height - alto_titulo)
+            relleno = round(d["espacio"] * min(area.width, area.height))
+            area = area.inflate(-2 * relleno, -relleno)
+            area.top = cuadro.y + alto_titulo
+
+            huecos = dividir(area, d["filas"], d["columnas"], relleno)
+            if lado_celda is None:
+                # Celdas cuadradas dejando espacio para el texto debajo del icono
+                lado_celda = min(huecos[0].width, round(huecos[0].height * (1 - d["alto_texto"])))
+            self.celdas.append([_cuadrado_centrado(hueco, lado_celda, arriba=True) for hueco in huecos])
+
+            lado_flecha = round(alto_titulo * 0.7)
+            centro_y = cuadro.y + alto_titulo // 2
+            izquierda = pygame.Rect(cuadro.x + relleno, centro_y - lado_flecha // 2, lado_flecha, lado_flecha)
+            derecha = izquierda.copy()
+            derecha.right = cuadro.right - relleno
+            self.flechas.append((izquierda, derecha))
+            self.centros_titulo.append((cuadro.centerx, centro_y))
+
+        self.lado_celda = lado_celda
+        self.tamaño_icono = max(16, round(lado_celda * 0.7))
+        self.fuente_titulo = max(12, round(self.cuadros[0].height * 0.09))
+        self.fuente_texto = max(10, round(lado_celda * 0.16))
+        self.fuente_boton = max(12, round(lado_flecha * 0.7))
+
+        # Barra inferior
+        d = diseno["barra"]
+        huecos = dividir(self.barra.inflate(-2 * margen, 0), 1, d["botones"], margen)
+        alto_boton = round(alto_barra * d["alto_boton"])
+        ancho_boton = min(huecos[0].width, round(alto_boton * d["proporcion"]))
+        self.botones_barra = []
+        for hueco in huecos:
+            boton = pygame.Rect(0, 0, ancho_boton, alto_boton)
+            boton.center = hueco.center
+            self.botones_barra.append(boton)
+        self.tamaño_icono_barra = max(16, round(alto_boton * 0.7))
+
+        # Tira de mensaje
+        d = diseno["tira"]
+        interior = self.tira.inflate(-2 * margen, -margen)
+        y = self.tira.y
+        alto_titulo = round(d["alto_titulo"] * self.tira.height)
+        self.centro_titulo_tira = (self.tira.centerx, y + alto_titulo // 2)
+        y += alto_titulo
+        self.simbolos_tira = pygame.Rect(interior.x, y, interior.width, round(d["alto_simbolos"] * self.tira.height))
+        y = self.simbolos_tira.bottom
+        alto_etiqueta = round(d["alto_etiqueta"] * self.tira.height)
+        self.centro_sugerencias = (self.tira.centerx, y + alto_etiqueta // 2)
+        y += alto_etiqueta
+
+        alto_botones = round(d["alto_botones"] * self.tira.height)
+        area = pygame.Rect(interior.x, y, interior.width, interior.bottom - alto_botones - margen - y)
+        filas, columnas = d["sugerencias"]["filas"], d["sugerencias"]["columnas"]
+        huecos = dividir(area, filas, columnas, margen)
+        lado = min(lado_celda, huecos[0].width, round(huecos[0].height * (1 - diseno["celdas"]["alto_texto"])))
+        self.sugerencias = [_cuadrado_centrado(hueco, lado, arriba=True) for hueco in huecos]
+
+        area = pygame.Rect(interior.x, interior.bottom - alto_botones, interior.width, alto_botones)
+        self.botones_tira = [hueco.inflate(0, -alto_botones // 4) for hueco in dividir(area, 1, 2, margen)]
+        # Con más categorías que cuadros se agrega un tercer botón para pasar de página de categorías
+        self.botones_tira_categorias = [hueco.inflate(0, -alto_botones // 4) for hueco in dividir(area, 1, 3, margen)]
+
+
+@lru_cache(maxsize=8)
+def calcular_geometria(ancho, alto):
+    """Geometría de la pantalla de inicio, calculada una sola vez por tamaño de pantalla"""
+    return Geometria(ancho, alto)
+
+
+def medir(repeticiones=200):
+    """Mide el costo de calcular el diseño y de consultarlo ya en caché"""
+    resoluciones = [(1280, 720), (1366, 768), (1440, 900), (1920, 1080), (2560, 1440), (3840, 2160)]
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for ancho, alto in resoluciones:
+            Geometria(ancho, alto)
+    calculo = (time.perf_counter() - inicio) / (repeticiones * len(resoluciones))
+
+    calcular_geometria.cache_clear()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for ancho, alto in resoluciones:
+            calcular_geometria(ancho, alto)
+    consulta = (time.perf_counter() - inicio) / (repeticiones * len(resoluciones))
+
+    print(f"📊 Cálculo del diseño: {calculo * 1e6:.1f} µs por resolución")
+    print(f"📊 Consulta en caché: {consulta * 1e6:.2f} µs")
+    for ancho, alto in resoluciones:
+        geometria = calcular_geometria(ancho, alto)
+        print(f"   {ancho}x{alto}: celda {geometria.lado_celda}px, icono {geometria.tamaño_icono}px")
+
+
+if __name__ == "__main__":
+    medir(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from Variables_globales import *
+from ManejoCamara import ManejoCamara
+from RegistroEventos import RegistroEventos
+from AppAsincrona import AplicacionAsincrona
+
+
+class GestorPantallas:
+    """Navegación entre pantallas con una sola cámara compartida y pantallas en caché
+
+    Cada pantalla se construye con (camara, music_manager, cambiar_pantalla, registro),
+    expone ejecutar() y deja de ejecutarse cuando su atributo activa pasa a False.
+    Si tiene un método descartar() se llama al sacarla de la caché.
+    Las pantallas construidas se guardan en una caché LRU acotada y la pantalla
+    más probable después de la actual se construye en segundo plano.
+    """
+
+    def __init__(self, camara=None, music_manager=None, max_pantallas=3, registro=None):
+        self.registro = registro if registro else RegistroEventos()
+        self.camara = camara if camara else ManejoCamara(ancho=ANCHO, alto=ALTO, modo_ocular=False,
+                                                         registro=self.registro)
+        self.music_manager = music_manager
+        self.max_pantallas = max_pantallas
+
+        self.fabricas = {}
+        self.siguientes_sugeridas = {}
+        self.transiciones = Counter()
+
+        self.pantallas = OrderedDict()
+        self.construyendo = {}
+        self.bloqueo = threading.Lock()
+        self.ejecutor = ThreadPoolExecutor(max_workers=1)
+
+        self.actual = None
+        self.pantalla_actual = None
+        self.siguiente = None
+
+    def registrar(self, nombre, fabrica, siguientes=()):
+        """Registra una pantalla y las que suelen visitarse después de ella"""
+        self.fabricas[nombre] = fabrica
+        self.siguientes_sugeridas[nombre] = list(siguientes)
+
+    def _construir(self, nombre):
+        return self.fabricas[nombre](camara=self.camara, music_manager=self.music_manager,
+                                     cambiar_pantalla=self.cambiar_pantalla, registro=self.registro)
+
+    def _guardar(self, nombre, pantalla):
+        descartadas = []
+        with self.bloqueo:
+            self.pantallas[nombre] = pantalla
+            self.pantallas.move_to_end(nombre)
+            while len(self.pantallas) > self.max_pantallas:
+                descartada, instancia = self.pantallas.popitem(last=False)
+                print(f"🗑️ Pantalla {descartada} descartada de la caché")
+                if instancia is not self.pantalla_actual:
+                    descartadas.append(instancia)
+        for instancia in descartadas:
+            self._descartar(instancia)
+
+    @staticmethod
+    def _descartar(pantalla):
+        if hasattr(pantalla, "descartar"):
+            pantalla.descartar()
+
+    def obtener(self, nombre):
+        """Devuelve la pantalla construida, esperando a la precarga si está en curso"""
+        with self.bloqueo:
+            if nombre in self.pantallas:
+                self.pantallas.move_to_end(nombre)
+                return self.pantallas[nombre]
+            futuro = self.construyendo.get(nombre)
+
+        pantalla = futuro.result() if futuro else self._construir(nombre)
+        self._guardar(nombre, pantalla)
+        return pantalla
+
+    def _precargar(self, nombre):
+        with self.bloqueo:
+            if nombre in self.pantallas or nombre in self.construyendo:
+                return
+
+            def construir_y_guardar():
+                try:
+                    pantalla = self._construir(nombre)
+                    self._guardar(nombre, pantalla)
+                    return pantalla
+                finally:
+                    with self.bloqueo:
+                        self.construyendo.pop(nombre, None)
+
+            self.construyendo[nombre] = self.ejecutor.submit(construir_y_guardar)
+
+    def _probable_siguiente(self, nombre):
+        """La transición más frecuente desde esta pantalla o, si no hay, la sugerida"""
+        candidatas = [(n, destino) for (origen, destino), n in self.transiciones.items()
+                      if origen == nombre and destino in self.fabricas]
+        if candidatas:
+            return max(candidatas)[1]
+        sugeridas = [s for s in self.siguientes_sugeridas.get(nombre, []) if s in self.fabricas]
+        return sugeridas[0] if sugeridas else None
+
+    def cambiar_pantalla(self, nombre):
+        """Callback de las pantallas: termina la actual y pasa a la indicada"""
+        if nombre == self.actual:
+            return
+        if nombre not in self.fabricas:
+            print(f"⚠️ Pantalla '{nombre}' no disponible")
+            return
+        self.siguiente = nombre
+        if self.pantalla_actual is not None:
+            self.pantalla_actual.activa = False
+
+    def _abrir_siguiente(self):
+        """Pasa a la pantalla pedida y precarga la probable siguiente; None si el usuario salió"""
+        if not self.siguiente:
+            return None
+        nombre, self.siguiente = self.siguiente, None
+        if self.actual:
+            self.transiciones[(self.actual, nombre)] += 1
+            self.registro.registrar("cambio_pantalla", origen=self.actual, destino=nombre)
+        self.actual = nombre
+
+        self.pantalla_actual = self.obtener(nombre)
+        probable = self._probable_siguiente(nombre)
+        if probable:
+            self._precargar(probable)
+        return self.pantalla_actual
+
+    def ejecutar(self, inicial="inicio"):
+        """Bucle de navegación: ejecuta pantallas hasta que el usuario sale"""
+        self.siguiente = inicial
+        pantalla = self._abrir_siguiente()
+        while pantalla is not None:
+            pantalla.ejecutar()
+            pantalla = self._abrir_siguiente()
+
+        self.liberar_recursos()
+
+    async def ejecutar_asincrono(self, inicial="inicio"):
+        """Como ejecutar(), pero cada pantalla corre sobre el bucle asíncrono"""
+        self.siguiente = inicial
+        pantalla = self._abrir_siguiente()
+        while pantalla is not None:
+            await AplicacionAsincrona(pantalla).ejecutar()
+            pantalla = self._abrir_siguiente()
+
+        self.liberar_recursos()
+
+    def liberar_recursos(self):
+        self.ejecutor.shutdown(wait=False)
+        with self.bloqueo:
+            pantallas = list(self.pantallas.values())
+            self.pantallas.clear()
+        for pantalla in pantallas:
+            self._descartar(pantalla)
+        self.camara.liberar_recursos()
+        self.registro.cerrar()
@@ -0,0 +1,236 @@
+import sys
+import time
+import numpy as np
+
+
+# Índices de landmarks de MediaPipe Hands
+MUNECA = 0
+PULGAR_PUNTA = 4
+INDICE_PUNTA = 8
+MEDIO_BASE = 9
+
+# Articulaciones de cada dedo (base -> punta): pulgar, índice, medio, anular, meñique
+DEDOS = np.array([
+    [1, 2, 3, 4],
+    [5, 6, 7, 8],
+    [9, 10, 11, 12],
+    [13, 14, 15, 16],
+    [17, 18, 19, 20],
+])
+
+# Tripletas (anterior, articulación, siguiente) para los dos ángulos de cada dedo
+_ANTERIOR = DEDOS[:, 0:2]
+_ARTICULACION = DEDOS[:, 1:3]
+_SIGUIENTE = DEDOS[:, 2:4]
+
+NINGUNO = "ninguno"
+PINZA = "pinza"
+PUNO = "puno"
+PALMA = "palma"
+APUNTAR = "apuntar"
+DESLIZAR_IZQUIERDA = "deslizar_izquierda"
+DESLIZAR_DERECHA = "deslizar_derecha"
+
+GESTOS = [NINGUNO, PINZA, PUNO, PALMA, APUNTAR, DESLIZAR_IZQUIERDA, DESLIZAR_DERECHA]
+
+
+def calcular_caracteristicas(puntos):
+    """Calcula en una sola pasada distancias normalizadas y curvatura de los dedos
+
+    puntos: arreglo (..., 21, 3) con uno o varios marcos de landmarks.
+    Devuelve (distancias (..., 21, 21) en unidades de palma, curvatura (..., 5) en radianes, palma (...)).
+    """
+    puntos = np.asarray(puntos, dtype=np.float32)
+    xy = puntos[..., :2]
+
+    diferencias = xy[..., :, None, :] - xy[..., None, :, :]
+    distancias = np.sqrt(np.einsum("...ijk,...ijk->...ij", diferencias, diferencias))
+
+    # Normalizar por el tamaño de la palma (muñeca -> base del dedo medio)
+    palma = np.maximum(distancias[..., MUNECA, MEDIO_BASE], 1e-6)
+    distancias = distancias / palma[..., None, None]
+
+    v1 = puntos[..., _ANTERIOR, :] - puntos[..., _ARTICULACION, :]
+    v2 = puntos[..., _SIGUIENTE, :] - puntos[..., _ARTICULACION, :]
+    producto = np.einsum("...k,...k->...", v1, v2)
+    normas = np.linalg.norm(v1, axis=-1) * np.linalg.norm(v2, axis=-1)
+    coseno = np.clip(producto / np.maximum(normas, 1e-9), -1.0, 1.0)
+
+    # Un dedo recto tiene ángulos de pi en cada articulación; la curvatura es lo que falta
+    curvatura = (np.pi - np.arccos(coseno)).sum(axis=-1)
+
+    return distancias, curvatura, palma
+
+
+def clasificar_lote(puntos, umbral_pinza=0.25, umbral_extendido=0.6, umbral_doblado=1.8):
+    """Clasifica gestos estáticos para un lote (N, 21, 3) sin estado temporal"""
+    distancias, curvatura, _ = calcular_caracteristicas(puntos)
+
+    extendido = curvatura < umbral_extendido
+    doblado = curvatura > umbral_doblado
+
+    pinza = distancias[..., PULGAR_PUNTA, INDICE_PUNTA] < umbral_pinza
+    puno = doblado[..., 1:].all(axis=-1)
+    palma = extendido.all(axis=-1)
+    apuntar = extendido[..., 1] & doblado[..., 2:].all(axis=-1)
+
+    # Prioridad: pinza > puño > apuntar > palma
+    return np.select([pinza, puno, apuntar, palma], [PINZA, PUNO, APUNTAR, PALMA], default=NINGUNO)
+
+
+class ReconocedorGestos:
+    """Reconoce gestos de la mano marco a marco con histéresis"""
+
+    def __init__(self, umbral_pinza=0.25, umbral_extendido=0.6, umbral_doblado=1.8,
+                 frames_salida=2, ventana_deslizar=6, distancia_deslizar=1.5):
+        self.umbral_pinza = umbral_pinza
+        self.umbral_extendido = umbral_extendido
+        self.umbral_doblado = umbral_doblado
+        self.frames_salida = frames_salida
+        self.distancia_deslizar = distancia_deslizar
+
+        # Histéresis de umbral: salir de la pinza requiere separar más los dedos
+        self.factor_salida_pinza = 1.4
+
+        # Buffer circular de la posición horizontal de la mano (en unidades de palma)
+        self.historial_x = np.zeros(ventana_deslizar, dtype=np.float32)
+        self.indice_historial = 0
+        self.muestras_historial = 0
+
+        self.gesto = NINGUNO
+        self.frames_distinto = 0
+
+    def reiniciar(self):
+        """Olvida el gesto actual, p. ej. cuando se pierde la mano"""
+        self.gesto = NINGUNO
+        self.frames_distinto = 0
+        self.muestras_historial = 0
+
+    def _detectar_deslizamiento(self, x_normalizada):
+        n = len(self.historial_x)
+        self.historial_x[self.indice_historial] = x_normalizada
+        self.indice_historial = (self.indice_historial + 1) % n
+        self.muestras_historial = min(self.muestras_historial + 1, n)
+
+        if self.muestras_historial < n:
+            return None
+
+        # El más antiguo es el siguiente a sobrescribir
+        desplazamiento = x_normalizada - self.historial_x[self.indice_historial]
+        if abs(desplazamiento) < self.distancia_deslizar:
+            return None
+
+        self.muestras_historial = 0
+        # La imagen de la cámara está espejada respecto a la pantalla
+        return DESLIZAR_IZQUIERDA if desplazamiento > 0 else DESLIZAR_DERECHA
+
+    def actualizar(self, puntos, umbral_pinza=None):
+        """Procesa un marco (21, 3) y devuelve el gesto activo"""
+        if umbral_pinza is not None:
+            self.umbral_pinza = umbral_pinza
+
+        puntos = np.asarray(puntos, dtype=np.float32)
+        distancias, curvatura, palma = calcular_caracteristicas(puntos)
+
+        extendido = curvatura < self.umbral_extendido
+        doblado = curvatura > self.umbral_doblado
+
+        umbral = self.umbral_pinza
+        if self.gesto == PINZA:
+            umbral *= self.factor_salida_pinza
+
+        deslizamiento = self._detectar_deslizamiento(float(puntos[MUNECA][0]) / float(palma))
+
+        if distancias[PULGAR_PUNTA, INDICE_PUNTA] < umbral:
+            candidato = PINZA
+        elif deslizamiento is not None:
+            candidato = deslizamiento
+        elif doblado[1:].all():
+            candidato = PUNO
+        elif extendido[1] and doblado[2:].all():
+            candidato = APUNTAR
+        elif extendido.all():
+            candidato = PALMA
+        else:
+            candidato = NINGUNO
+
+        if candidato == self.gesto:
+            self.frames_distinto = 0
+        elif candidato != NINGUNO or self.frames_distinto + 1 >= self.frames_salida:
+            # Un gesto nuevo entra de inmediato; volver a "ninguno" requiere varios marcos
+            self.gesto = candidato
+            self.frames_distinto = 0
+        else:
+            self.frames_distinto += 1
+
+        return self.gesto
+
+
+def _landmarks_a_arreglo(landmarks):
+    return np.array([(p.x, p.y, p.z) for p in landmarks.landmark], dtype=np.float32)
+
+
+def grabar(ruta, duracion=20, usocam=0):
+    """Graba landmarks de la mano desde la cámara a un archivo .npy"""
+    import cv2
+    import mediapipe as mp
+
+    camara = cv2.VideoCapture(usocam)
+    manos = mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    marcos = []
+    print(f"🎥 Grabando landmarks durante {duracion} s...")
+
+    tiempo_inicio = time.time()
+    while time.time() - tiempo_inicio < duracion:
+        ret, marco = camara.read()
+        if not ret:
+            continue
+        resultados = manos.process(cv2.cvtColor(marco, cv2.COLOR_BGR2RGB))
+        if resultados.multi_hand_landmarks:
+            marcos.append(_landmarks_a_arreglo(resultados.multi_hand_landmarks[0]))
+
+    manos.close()
+    camara.release()
+    np.save(ruta, np.stack(marcos) if marcos else np.zeros((0, 21, 3), dtype=np.float32))
+    print(f"✅ {len(marcos)} marcos guardados en {ruta}")
+
+
+def medir(ruta=None, repeticiones=5):
+    """Mide el tiempo por marco del reconocedor sobre landmarks grabados"""
+    if ruta:
+        marcos = np.load(ruta).astype(np.float32)
+    else:
+        print("⚠️ Sin archivo de landmarks, usando datos sintéticos")
+        marcos = np.random.default_rng(0).random((2000, 21, 3), dtype=np.float32)
+
+    if not len(marcos):
+        print("⚠️ El archivo no contiene marcos")
+        return
+
+    reconocedor = ReconocedorGestos()
+    tiempos = []
+    conteo = dict.fromkeys(GESTOS, 0)
+    for _ in range(repeticiones):
+        reconocedor.reiniciar()
+        for marco in marcos:
+            inicio = time.perf_counter()
+            gesto = reconocedor.actualizar(marco)
+            tiempos.append(time.perf_counter() - inicio)
+            conteo[gesto] += 1
+
+    tiempos = np.array(tiempos) * 1e6
+    print(f"📊 Por marco: media {tiempos.mean():.1f} µs, p50 {np.percentile(tiempos, 50):.1f} µs, "
+          f"p99 {np.percentile(tiempos, 99):.1f} µs")
+
+    inicio = time.perf_counter()
+    clasificar_lote(marcos)
+    lote = (time.perf_counter() - inicio) * 1e6 / len(marcos)
+    print(f"📊 En lote: {lote:.2f} µs por marco ({len(marcos)} marcos)")
+    print(f"Gestos: {', '.join(f'{g}={n // repeticiones}' for g, n in conteo.items() if n)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "grabar":
+        grabar(sys.argv[2])
+    else:
+        medir(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,10 +1,14 @@
 import pygame
 import sys
-import os
 import subprocess
 import platform
+import time
 from Variables_globales import *
 from ManejoCamara import ManejoCamara
+from Vocabulario import Vocabulario, CacheIconos, crear_icono
+from Diseno import calcular_geometria
+from Prediccion import PredictorSimbolos
+from RegistroEventos import RegistroEventos
 
 
 class SistemaTTS:
@@ -34,6 +38,21 @@ class SistemaTTS:
             return "powershell"
         return None
 
+    def comando(self, texto):
+        """Argumentos del comando del sistema que dice el texto, o None si no hay TTS"""
+        if self.comando_tts == "say":  # macOS
+            return ["say", texto]
+        elif self.comando_tts == "espeak":  # Linux con espeak
+            return ["espeak", "-v", "es", texto]
+        elif self.comando_tts == "spd-say":  # Linux con speech-dispatcher
+            return ["spd-say", texto]
+        elif self.comando_tts == "powershell":  # Windows
+            # Escapar comillas para PowerShell
+            texto_escapado = texto.replace('"', '`"')
+            comando = f'Add-Type -AssemblyName System.Speech; $speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; $speak.Speak("{texto_escapado}")'
+            return ["powershell", "-Command", comando]
+        return None
+
     def decir_texto(self, texto):
         """Decir texto usando el comando del sistema"""
         if not self.comando_tts:
@@ -41,29 +60,62 @@ class SistemaTTS:
             return False
 
         try:
-            if self.comando_tts == "say":  # macOS
-                subprocess.Popen(["say", texto])
-            elif self.comando_tts == "espeak":  # Linux con espeak
-                subprocess.Popen(["espeak", "-v", "es", texto])
-            elif self.comando_tts == "spd-say":  # Linux con speech-dispatcher
-                subprocess.Popen(["spd-say", texto])
-            elif self.comando_tts == "powershell":  # Windows
-                # Escapar comillas para PowerShell
-                texto_escapado = texto.replace('"', '`"')
-                comando = f'Add-Type -AssemblyName System.Speech; $speak = New-Object System.Speech.Synthesis.SpeechSynthesizer; $speak.Speak("{texto_escapado}")'
-                subprocess.Popen(["powershell", "-Command", comando])
+            subprocess.Popen(self.comando(texto))
             return True
         except Exception as e:
             print(f"Error ejecutando comando de TTS: {e}")
             return False
 
 
+class MonitorEnergia:
+    """Mide el uso de CPU y los despertares por segundo en modo activo y en reposo"""
+
+    def __init__(self):
+        self.estadisticas = {"activo": [0.0, 0.0, 0], "reposo": [0.0, 0.0, 0]}  # CPU, tiempo real, despertares
+        self.estado = "activo"
+        self.tiempo_real = time.perf_counter()
+        self.tiempo_cpu = time.process_time()
+
+    def registrar(self, en_reposo):
+        """Registrar un despertar del bucle principal"""
+        ahora_real = time.perf_counter()
+        ahora_cpu = time.process_time()
+
+        datos = self.estadisticas[self.estado]
+        datos[0] += ahora_cpu - self.tiempo_cpu
+        datos[1] += ahora_real - self.tiempo_real
+        datos[2] += 1
+
+        self.estado = "reposo" if en_reposo else "activo"
+        self.tiempo_real = ahora_real
+        self.tiempo_cpu = ahora_cpu
+
+    def resumen(self):
+        """Devuelve CPU% y despertares por segundo de cada estado"""
+        resumen = {}
+        for estado, (cpu, real, despertares) in self.estadisticas.items():
+            if real > 0:
+                resumen[estado] = {"cpu": 100 * cpu / real, "despertares": despertares / real}
+        return resumen
+
+    def imprimir(self):
+        for estado, datos in self.resumen().items():
+            print(f"📊 {estado}: CPU {datos['cpu']:.1f}%, {datos['despertares']:.1f} despertares/s")
+
+
 class Inicio:
-    def __init__(self, camara=None, music_manager=None, cambiar_pantalla=None):
+    def __init__(self, camara=None, music_manager=None, cambiar_pantalla=None, tiempo_reposo=60,
+                 intervalo_sondeo_reposo=0.5, ruta_vocabulario="vocabulario.json",
+                 ruta_historial=None, hablar_al_seleccionar=True,
+                 ruta_registro="registros/eventos.jsonl", registro=None):
         # Configuración de la pantalla
         self.ANCHO, self.ALTO = ANCHO, ALTO
         self.pantalla = pantalla
-        pygame.display.set_caption("SIMUS.MJN - Comunicación Aumentativa")
+
+        # Con un gestor de pantallas la cámara y el registro son compartidos y no se liberan aquí
+        self.camara_propia = camara is None
+        self.registro_propio = registro is None
+        self.activa = True
 
         # Colores
         self.COLOR_FONDO = (244, 202, 161)  # #f4caa1
@@ -71,16 +123,19 @@ class Inicio:
         self.COLOR_BLANCO = (255, 255, 255)
         self.COLOR_AZUL = (12, 0, 255)  # #0c00ff
 
-        # Colores de los cuadros
-        self.COLOR_SOCIALES = (213, 247, 206)  # #d5f7ce
-        self.COLOR_NECESIDADES = (245, 210, 210)  # #f5d2d2
-        self.COLOR_EMOCIONES = (254, 255, 195)  # #feffc3
-        self.COLOR_CONTROL = (197, 201, 254)  # #c5c9fe
-        self.COLOR_PERSONAS = (245, 219, 253)  # #f5dbfd
-        self.COLOR_ACTIVIDADES = (255, 221, 174)  # #ffddae
+        # Geometría calculada una vez para este tamaño de pantalla; la usan dibujo y clics
+        self.geometria = calcular_geometria(self.ANCHO, self.ALTO)
+        self.fuente_titulo = pygame.font.SysFont("Arial", self.geometria.fuente_titulo, bold=True)
+        self.fuente_texto = pygame.font.SysFont("Arial", self.geometria.fuente_texto)
+        self.fuente_boton = pygame.font.SysFont("Arial", self.geometria.fuente_boton, bold=True)
+
+        # Registro de uso para revisión clínica (se escribe en segundo plano)
+        self.registro = registro if registro else RegistroEventos(ruta_registro)
 
         # Inicializar cámara
         self.camara = camara if camara else ManejoCamara(ancho=self.ANCHO, alto=self.ALTO, modo_ocular=False)
+        if self.camara.registro is None:
+            self.camara.registro = self.registro
 
         # Gestión de música
         self.music_manager = music_manager
@@ -90,10 +145,44 @@ class Inicio:
 
         # Control de clic
         self.control_clic = False
+        self.clic_activo = False
+
+        # Tras un clic se pausa 200 ms; con pausa_bloqueante=False se ignoran clics
+        # durante ese tiempo sin detener el bucle (runtime asíncrono)
+        self.pausa_bloqueante = True
+        self.clics_bloqueados_hasta = 0
+
+        # El runtime asíncrono lo asigna para que las llamadas a la cámara corran en su hilo
+        self.programar_camara = None
+
+        # Modo reposo: tras tiempo_reposo segundos sin detección se redibuja sólo por eventos
+        # y la cámara se consulta cada intervalo_sondeo_reposo segundos
+        self.tiempo_reposo = tiempo_reposo
+        self.intervalo_sondeo_reposo = intervalo_sondeo_reposo
+        self.en_reposo = False
+        self.ultima_deteccion = time.time()
+        self.monitor_energia = MonitorEnergia()
 
         # Inicializar gestor de TTS del sistema
         self.tts_sistema = SistemaTTS()
 
+        # Vocabulario de pictogramas; sus iconos se decodifican por página visible
+        lado_icono = self.geometria.tamaño_icono
+        self.vocabulario = Vocabulario(ruta_vocabulario, cache=CacheIconos(tamaño=(lado_icono, lado_icono)))
+
+        # Si hay más categorías que cuadros se muestran por páginas de categorías
+        self.pagina_categorias = 0
+        self.paginas_categorias = -(-len(self.vocabulario.categorias) // len(self.geometria.cuadros))
+        if self.paginas_categorias > 1:
+            print(f"📂 {len(self.vocabulario.categorias)} categorías en {self.paginas_categorias} páginas")
+
+        # Tira de mensaje: los símbolos se acumulan y se dicen juntos como frase
+        self.mensaje = []
+        self.hablar_al_seleccionar = hablar_al_seleccionar
+        # Sin ruta_historial cada usuario de la cámara aprende de su propio historial
+        self.ruta_historial = ruta_historial
+        self.cargar_predictor()
+
         # Cargar imágenes
         self.cargar_iconos()
 
@@ -101,186 +190,157 @@ class Inicio:
         self.cuadros = self.crear_cuadros()
         self.botones_barra = self.crear_botones_barra()
         self.botones_comunicacion = self.crear_botones_comunicacion()
+        self.botones_tira = self.crear_botones_tira()
 
     def decir_texto(self, texto):
         """Decir texto usando el sistema de TTS del sistema operativo"""
         self.tts_sistema.decir_texto(texto)
 
     def cargar_iconos(self):
-        """Cargar y preparar los iconos de la aplicación"""
+        """Cargar los iconos de la barra inferior (los pictogramas se cargan bajo demanda)"""
         self.iconos = {}
         iconos_info = [
-            # Botones de barra inferior
             {"nombre": "instrucciones", "archivo": "icono-12.png", "texto": "Instrucciones"},
             {"nombre": "configuracion", "archivo": "icono-10.png", "texto": "Configuración"},
             {"nombre": "salir", "archivo": "icono-26.png", "texto": "Salir"},
             {"nombre": "info", "archivo": "icono-14.png", "texto": "Información"},
             {"nombre": "jugar", "archivo": "icono-3.png", "texto": "Jugar"},
             {"nombre": "inicio", "archivo": "icono-24.png", "texto": "Inicio"},
-
-            # Iconos de comunicación - Sociales
-            {"nombre": "hola", "archivo": "icono-adios.png", "texto": "Hola"},
-            {"nombre": "adios", "archivo": "icono-adios-2.png", "texto": "Adiós"},
-            {"nombre": "gracias", "archivo": "icono-gracias.png", "texto": "Gracias"},
-            {"nombre": "porfavor", "archivo": "icono-porfavor.png", "texto": "Por favor"},
-            {"nombre": "si", "archivo": "icono-si.png", "texto": "Sí"},
-            {"nombre": "no", "archivo": "icono-no.png", "texto": "No"},
-
-            # Iconos de comunicación - Necesidades
-            {"nombre": "hambre", "archivo": "icono-hambre.png", "texto": "Hambre"},
-            {"nombre": "incomodo", "archivo": "icono-incomodo.png", "texto": "Incomodo"},
-            {"nombre": "bano", "archivo": "icono-ba-o.png", "texto": "Baño"},
-            {"nombre": "sed", "archivo": "icono-SED.png", "texto": "Sed"},
-            {"nombre": "cansado", "archivo": "icono-cansado.png", "texto": "Cansado"},
-            {"nombre": "dolor", "archivo": "icono-dolor.png", "texto": "Dolor"},
-
-            # Iconos de comunicación - Emociones
-            {"nombre": "feliz", "archivo": "icono-18.png", "texto": "Feliz"},
-            {"nombre": "triste", "archivo": "icono-9.png", "texto": "Triste"},
-            {"nombre": "enojado", "archivo": "icono-2.png", "texto": "Enojado"},
-            {"nombre": "miedo", "archivo": "icono-20.png", "texto": "Miedo"},
-            {"nombre": "nervioso", "archivo": "icono-5.png", "texto": "Nervioso"},
-            {"nombre": "calma", "archivo": "icono-16.png", "texto": "Calma"},
-
-            # Iconos de comunicación - Control
-            {"nombre": "ayuda", "archivo": "icono-8.png", "texto": "Ayuda"},
-            {"nombre": "no-quiero", "archivo": "icono-15.png", "texto": "No quiero"},
-            {"nombre": "mas", "archivo": "icono-28.png", "texto": "Más"},
-            {"nombre": "quiero", "archivo": "icono-4.png", "texto": "Quiero"},
-            {"nombre": "basta", "archivo": "icono-25.png", "texto": "Basta"},
-            {"nombre": "espera", "archivo": "cono.png", "texto": "Espera"},
-
-            # Iconos de comunicación - Personas
-            {"nombre": "mama", "archivo": "icono-11.png", "texto": "Mamá"},
-            {"nombre": "enfermera", "archivo": "icono-6.png", "texto": "Enfermera"},
-            {"nombre": "hermano", "archivo": "icono-23.png", "texto": "Hermano"},
-            {"nombre": "papa", "archivo": "icono-21.png", "texto": "Papá"},
-            {"nombre": "maestra", "archivo": "icono-19.png", "texto": "Maestra"},
-            {"nombre": "amigo", "archivo": "icono-22.png", "texto": "Amigo"},
-
-            # Iconos de comunicación - Actividades
-            {"nombre": "jugar-act", "archivo": "icono-13.png", "texto": "Jugar"},
-            {"nombre": "salir-act", "archivo": "icono-7.png", "texto": "Salir"},
-            {"nombre": "musica", "archivo": "image.png", "texto": "Música"},
-            {"nombre": "television", "archivo": "icono-27.png", "texto": "Televisión"},
-            {"nombre": "dormir", "archivo": "icono.png", "texto": "Dormir"},
-            {"nombre": "libro", "archivo": "icono-17.png", "texto": "Libro"},
         ]
 
+        lado = self.geometria.tamaño_icono_barra
         for icono_info in iconos_info:
-            try:
-                ruta = os.path.join("img", icono_info["archivo"])
-                if os.path.exists(ruta):
-                    imagen = pygame.image.load(ruta)
-                    self.iconos[icono_info["nombre"]] = {
-                        "imagen": pygame.transform.scale(imagen, (70, 70)),
-                        "texto": icono_info["texto"]
-                    }
-                else:
-                    # Crear placeholder si no existe la imagen
-                    superficie = pygame.Surface((70, 70), pygame.SRCALPHA)
-                    pygame.draw.circle(superficie, (100, 100, 200), (35, 35), 30)
-                    self.iconos[icono_info["nombre"]] = {
-                        "imagen": superficie,
-                        "texto": icono_info["texto"]
-                    }
-            except Exception as e:
-                print(f"Error cargando icono {icono_info['nombre']}: {e}")
-                # Crear placeholder en caso de error
-                superficie = pygame.Surface((70, 70), pygame.SRCALPHA)
-                pygame.draw.circle(superficie, (200, 100, 100), (35, 35), 30)
-                self.iconos[icono_info["nombre"]] = {
-                    "imagen": superficie,
-                    "texto": icono_info["texto"]
-                }
+            self.iconos[icono_info["nombre"]] = {
+                "imagen": crear_icono(icono_info["archivo"], (lado, lado)),
+                "texto": icono_info["texto"]
+            }
 
     def crear_cuadros(self):
         """Crear los cuadros de diálogo de la interfaz"""
-        cuadros = [
-            {"rect": pygame.Rect(29, 26, 400, 400), "color": self.COLOR_SOCIALES, "titulo": "SOCIALES"},
-            {"rect": pygame.Rect(29 + 472, 26, 400, 400), "color": self.COLOR_NECESIDADES, "titulo": "NECESIDADES"},
-            {"rect": pygame.Rect(29 + 944, 26, 400, 400), "color": self.COLOR_EMOCIONES, "titulo": "EMOCIONES"},
-            {"rect": pygame.Rect(29, 26 + 436, 400, 400), "color": self.COLOR_CONTROL, "titulo": "CONTROL"},
-            {"rect": pygame.Rect(29 + 472, 26 + 436, 400, 400), "color": self.COLOR_PERSONAS, "titulo": "PERSONAS"},
-            {"rect": pygame.Rect(29 + 944, 26 + 436, 400, 400), "color": self.COLOR_ACTIVIDADES,
-             "titulo": "ACTIVIDADES"}
-        ]
+        cuadros = []
+        n = len(self.geometria.cuadros)
+        visibles = self.vocabulario.categorias[self.pagina_categorias * n:(self.pagina_categorias + 1) * n]
+        for indice, categoria in enumerate(visibles):
+            cuadros.append({
+                "rect": self.geometria.cuadros[indice],
+                "indice": indice,
+                "centro_titulo": self.geometria.centros_titulo[indice],
+                "color": categoria["color"],
+                "titulo": categoria["titulo"],
+                "categoria": categoria["nombre"]
+            })
         return cuadros
 
     def crear_botones_barra(self):
         """Crear los botones de la barra inferior"""
-        botones = [
-            {"rect": pygame.Rect(107, self.ALTO - 119 + 10, 120, 100), "icono": "instrucciones",
-             "accion": self.ir_instrucciones},
-            {"rect": pygame.Rect(342, self.ALTO - 119 + 10, 120, 100), "icono": "configuracion",
-             "accion": self.ir_configuracion},
-            {"rect": pygame.Rect(588, self.ALTO - 119 + 10, 120, 100), "icono": "inicio", "accion": self.ir_inicio},
-            {"rect": pygame.Rect(833, self.ALTO - 119 + 10, 120, 100), "icono": "jugar", "accion": self.ir_juegos},
-            {"rect": pygame.Rect(1076, self.ALTO - 119 + 10, 120, 100), "icono": "info", "accion": self.mostrar_info},
-            {"rect": pygame.Rect(1319, self.ALTO - 119 + 10, 120, 100), "icono": "salir", "accion": self.salir}
+        acciones = [
+            ("instrucciones", self.ir_instrucciones),
+            ("configuracion", self.ir_configuracion),
+            ("inicio", self.ir_inicio),
+            ("jugar", self.ir_juegos),
+            ("info", self.mostrar_info),
+            ("salir", self.salir)
         ]
+        botones = [{"rect": rect, "icono": icono, "accion": accion}
+                   for rect, (icono, accion) in zip(self.geometria.botones_barra, acciones)]
         return botones
 
     def crear_botones_comunicacion(self):
-        """Crear los botones de comunicación aumentativa para todas las categorías"""
+        """Crear los botones de la página visible de cada categoría y sus flechas de página"""
         botones = []
+        self.botones_pagina = []
+
+        for cuadro in self.cuadros:
+            nombre_categoria = cuadro["categoria"]
+            celdas = self.geometria.celdas[cuadro["indice"]]
+
+            for rect, celda in zip(celdas, self.vocabulario.pagina(nombre_categoria)):
+                botones.append({
+                    "rect": rect,
+                    "celda": celda,
+                    "texto": celda["texto"]
+                })
+
+            # Flechas para cambiar de página si la categoría tiene más de una
+            if self.vocabulario.numero_paginas(nombre_categoria) > 1:
+                izquierda, derecha = self.geometria.flechas[cuadro["indice"]]
+                self.botones_pagina.append({"rect": izquierda, "categoria": nombre_categoria,
+                                            "paso": -1, "texto": "<"})
+                self.botones_pagina.append({"rect": derecha, "categoria": nombre_categoria,
+                                            "paso": 1, "texto": ">"})
 
-        # Configuración de la cuadrícula para cada categoría
-        categorias = [
-            {
-                "nombre": "sociales",
-                "posicion": (29, 26),
-                "botones": ["hola", "adios", "gracias", "porfavor", "si", "no"]
-            },
-            {
-                "nombre": "necesidades",
-                "posicion": (29 + 472, 26),
-                "botones": ["hambre", "incomodo", "bano", "sed", "cansado", "dolor"]
-            },
-            {
-                "nombre": "emociones",
-                "posicion": (29 + 944, 26),
-                "botones": ["feliz", "triste", "enojado", "miedo", "nervioso", "calma"]
-            },
-            {
-                "nombre": "control",
-                "posicion": (29, 26 + 436),
-                "botones": ["ayuda", "no-quiero", "mas", "quiero", "basta", "espera"]
-            },
-            {
-                "nombre": "personas",
-                "posicion": (29 + 472, 26 + 436),
-                "botones": ["mama", "enfermera", "hermano", "papa", "maestra", "amigo"]
-            },
-            {
-                "nombre": "actividades",
-                "posicion": (29 + 944, 26 + 436),
-                "botones": ["jugar-act", "salir-act", "musica", "television", "dormir", "libro"]
-            }
-        ]
+        return botones
 
-        # Crear botones para cada categoría
-        for categoria in categorias:
-            base_x, base_y = categoria["posicion"]
-            botones_categoria = categoria["botones"]
+    def cambiar_pagina(self, nombre_categoria, paso):
+        """Mostrar otra página de una categoría"""
+        self.vocabulario.cambiar_pagina(nombre_categoria, paso)
+        self.botones_comunicacion = self.crear_botones_comunicacion()
 
-            for i, nombre_icono in enumerate(botones_categoria):
-                fila = i // 3  # 3 columnas
-                columna = i % 3  # 3 filas
+    def cambiar_categorias(self):
+        """Mostrar la siguiente página de categorías"""
+        self.pagina_categorias = (self.pagina_categorias + 1) % self.paginas_categorias
+        self.cuadros = self.crear_cuadros()
+        self.botones_comunicacion = self.crear_botones_comunicacion()
 
-                x = base_x + 20 + columna * 120
-                y = base_y + 80 + fila * 120
-                rect = pygame.Rect(x, y, 100, 100)
+    def cargar_predictor(self):
+        """Carga el historial de sugerencias del usuario activo"""
+        self.usuario_historial = self.camara.usuario
+        self.predictor = PredictorSimbolos(ruta_historial=self.ruta_historial or self.camara.ruta_historial())
 
-                if nombre_icono in self.iconos:
-                    botones.append({
-                        "rect": rect,
-                        "icono": nombre_icono,
-                        "texto": self.iconos[nombre_icono]["texto"]
-                    })
+    def usuario_cambiado(self):
+        """Tras cambiar de usuario: su historial de sugerencias y un mensaje vacío"""
+        if self.usuario_historial == self.camara.usuario:
+            return
+        self.cargar_predictor()
+        self.mensaje = []
+        self.botones_tira = self.crear_botones_tira()
 
+    def crear_botones_tira(self):
+        """Crear las sugerencias del siguiente símbolo y los botones Hablar/Borrar"""
+        botones = []
+        huecos = self.geometria.sugerencias
+
+        prefijo = [celda["nombre"] for celda in self.mensaje]
+        celdas = [self.vocabulario.simbolos[nombre] for nombre in self.predictor.sugerir(prefijo, k=len(huecos))
+                  if nombre in self.vocabulario.simbolos]
+        for rect, celda in zip(huecos, celdas):
+            botones.append({"rect": rect, "celda": celda, "texto": celda["texto"]})
+
+        if self.paginas_categorias > 1:
+            hablar, borrar, mas = self.geometria.botones_tira_categorias
+            botones.append({"rect": mas, "texto": "Más", "accion": self.cambiar_categorias})
+        else:
+            hablar, borrar = self.geometria.botones_tira
+        botones.append({"rect": hablar, "texto": "Hablar", "accion": self.hablar_mensaje})
+        botones.append({"rect": borrar, "texto": "Borrar", "accion": self.borrar_simbolo})
         return botones
 
+    def seleccionar_simbolo(self, celda, origen="cuadricula"):
+        """Agregar un símbolo a la tira de mensaje"""
+        self.mensaje.append(celda)
+        self.registro.registrar("seleccion", simbolo=celda["nombre"], origen=origen,
+                                posicion=len(self.mensaje), usuario=self.camara.usuario)
+        if self.hablar_al_seleccionar:
+            self.decir_texto(celda["texto"])
+        self.botones_tira = self.crear_botones_tira()
+
+    def borrar_simbolo(self):
+        """Quitar el último símbolo de la tira"""
+        if self.mensaje:
+            self.mensaje.pop()
+            self.botones_tira = self.crear_botones_tira()
+
+    def hablar_mensaje(self):
+        """Decir la frase completa y aprenderla para futuras sugerencias"""
+        if not self.mensaje:
+            return
+        self.decir_texto(" ".join(celda["texto"] for celda in self.mensaje))
+        self.predictor.registrar_mensaje([celda["nombre"] for celda in self.mensaje])
+        self.registro.registrar("mensaje", simbolos=[celda["nombre"] for celda in self.mensaje],
+                                usuario=self.camara.usuario)
+        self.mensaje = []
+        self.botones_tira = self.crear_botones_tira()
+
     def ir_instrucciones(self):
         if self.cambiar_pantalla:
             self.cambiar_pantalla("instrucciones")
@@ -301,6 +361,8 @@ class Inicio:
         self.decir_texto("SIMUS.MJN es un sistema de comunicación aumentativa y alternativa")
 
     def salir(self):
+        self.registro.registrar("salir")
+        self.registro.cerrar()
         pygame.quit()
         sys.exit()
 
@@ -314,9 +376,8 @@ class Inicio:
 
         # Dibujar título
         if "titulo" in cuadro:
-            fuente = pygame.font.SysFont("Arial", 36, bold=True)
-            texto = fuente.render(cuadro["titulo"], True, NEGRO)
-            texto_rect = texto.get_rect(center=(cuadro["rect"].centerx, cuadro["rect"].y + 30))
+            texto = self.fuente_titulo.render(cuadro["titulo"], True, NEGRO)
+            texto_rect = texto.get_rect(center=cuadro["centro_titulo"])
             self.pantalla.blit(texto, texto_rect)
 
     def dibujar_boton_barra(self, boton_info, mouse_pos):
@@ -345,10 +406,7 @@ class Inicio:
     def dibujar_boton_comunicacion(self, boton_info, mouse_pos):
         """Dibuja un botón de comunicación"""
         boton_rect = boton_info["rect"]
-        icono_data = self.iconos.get(boton_info["icono"], None)
-
-        if not icono_data:
-            return
+        imagen = self.vocabulario.icono(boton_info["celda"])
 
         # Cambiar color si el mouse está encima
         color = (200, 200, 200) if boton_rect.collidepoint(mouse_pos) else BLANCO
@@ -360,101 +418,264 @@ class Inicio:
         pygame.draw.rect(self.pantalla, NEGRO, boton_rect, width=2, border_radius=15)
 
         # Dibujar icono centrado
-        icono_rect = icono_data["imagen"].get_rect(center=boton_rect.center)
-        self.pantalla.blit(icono_data["imagen"], icono_rect)
+        icono_rect = imagen.get_rect(center=boton_rect.center)
+        self.pantalla.blit(imagen, icono_rect)
 
         # Dibujar texto debajo del icono
         if "texto" in boton_info:
-            fuente = pygame.font.SysFont("Arial", 16)
-            texto = fuente.render(boton_info["texto"], True, NEGRO)
-            texto_rect = texto.get_rect(center=(boton_rect.centerx, boton_rect.bottom + 15))
+            texto = self.fuente_texto.render(boton_info["texto"], True, NEGRO)
+            texto_rect = texto.get_rect(midtop=(boton_rect.centerx, boton_rect.bottom + 2))
             self.pantalla.blit(texto, texto_rect)
 
+    def pausa_feedback(self):
+        """Pequeña pausa para feedback tras un clic"""
+        if self.pausa_bloqueante:
+            pygame.time.delay(200)
+        else:
+            self.clics_bloqueados_hasta = time.time() + 0.2
+
+    def actualizar_clic(self, clic_camara):
+        """Convierte el estado de clic de la cámara en el clic que atiende la interfaz
+
+        Sólo el flanco de subida cuenta: un parpadeo o una pinza sostenidos son un solo clic.
+        """
+        self.clic_activo = bool(clic_camara) and not self.control_clic
+        self.control_clic = bool(clic_camara)
+        return self.clic_activo
+
+    def llamar_camara(self, funcion, al_terminar=None):
+        """Llama a la cámara y después a al_terminar, en el hilo de cámara si lo hay"""
+        if self.programar_camara:
+            self.programar_camara(funcion, al_terminar)
+            return
+        funcion()
+        if al_terminar:
+            al_terminar()
+
+    def manejar_eventos(self, eventos):
+        """Atiende eventos de pygame; devuelve False si hay que salir"""
+        continuar = True
+        for evento in eventos:
+            if evento.type == pygame.QUIT:
+                continuar = False
+            elif evento.type == pygame.KEYDOWN:
+                if evento.key == pygame.K_ESCAPE:
+                    continuar = False
+                elif evento.key == pygame.K_TAB:
+                    # El cuidador cambia de paciente sin reiniciar la cámara
+                    self.llamar_camara(self.camara.siguiente_usuario, self.usuario_cambiado)
+                elif evento.key == pygame.K_n:
+                    self.llamar_camara(self.camara.nuevo_usuario, self.usuario_cambiado)
+        return continuar
+
+    def dibujar_boton_texto(self, boton_info, mouse_pos):
+        """Dibuja un botón con texto (flechas de página, Hablar, Borrar)"""
+        boton_rect = boton_info["rect"]
+        color = (200, 200, 200) if boton_rect.collidepoint(mouse_pos) else BLANCO
+        pygame.draw.rect(self.pantalla, color, boton_rect, border_radius=10)
+        pygame.draw.rect(self.pantalla, NEGRO, boton_rect, width=2, border_radius=10)
+
+        texto = self.fuente_boton.render(boton_info["texto"], True, NEGRO)
+        self.pantalla.blit(texto, texto.get_rect(center=boton_rect.center))
+
+    def dibujar_tira(self, mouse_pos):
+        """Dibuja la tira de mensaje con sus símbolos, sugerencias y botones"""
+        geometria = self.geometria
+        pygame.draw.rect(self.pantalla, self.COLOR_BLANCO, geometria.tira, border_radius=20)
+        pygame.draw.rect(self.pantalla, self.COLOR_AZUL, geometria.tira, width=3, border_radius=20)
+
+        titulo = self.fuente_boton.render("MENSAJE", True, NEGRO)
+        self.pantalla.blit(titulo, titulo.get_rect(center=geometria.centro_titulo_tira))
+
+        # Símbolos del mensaje en filas de iconos (se muestran los últimos que caben)
+        paso = geometria.tamaño_icono + 8
+        area = geometria.simbolos_tira
+        columnas = max(1, area.width // paso)
+        filas = max(1, area.height // paso)
+        for i, celda in enumerate(self.mensaje[-filas * columnas:]):
+            x = area.x + (i % columnas) * paso
+            y = area.y + (i // columnas) * paso
+            self.pantalla.blit(self.vocabulario.icono(celda), (x, y))
+
+        texto = self.fuente_boton.render("SUGERENCIAS", True, NEGRO)
+        self.pantalla.blit(texto, texto.get_rect(center=geometria.centro_sugerencias))
+
+        for boton in self.botones_tira:
+            if "celda" in boton:
+                self.dibujar_boton_comunicacion(boton, mouse_pos)
+            else:
+                self.dibujar_boton_texto(boton, mouse_pos)
+
+    def dibujar_interfaz(self, cursor_x, cursor_y, clic_activo):
+        """Dibuja la pantalla completa y atiende los clics sobre los botones"""
+        # Dibujar fondo
+        self.pantalla.fill(self.COLOR_FONDO)
+
+        # Dibujar cuadro principal blanco con borde azul
+        cuadro_principal = self.geometria.principal
+        radio = self.geometria.radio_principal
+        pygame.draw.rect(self.pantalla, self.COLOR_BLANCO, cuadro_principal, border_radius=radio)
+        pygame.draw.rect(self.pantalla, self.COLOR_AZUL, cuadro_principal, width=3, border_radius=radio)
+
+        # Dibujar cuadros de comunicación
+        for cuadro in self.cuadros:
+            self.dibujar_cuadro(cuadro)
+
+        # Dibujar botones de comunicación
+        for boton in self.botones_comunicacion:
+            self.dibujar_boton_comunicacion(boton, (cursor_x, cursor_y))
+
+            # Manejar clics en botones de comunicación
+            if boton["rect"].collidepoint(cursor_x, cursor_y) and clic_activo:
+                self.seleccionar_simbolo(boton["celda"])
+                self.pausa_feedback()
+
+        # Dibujar flechas de página
+        for boton in self.botones_pagina:
+            self.dibujar_boton_texto(boton, (cursor_x, cursor_y))
+
+            if boton["rect"].collidepoint(cursor_x, cursor_y) and clic_activo:
+                self.cambiar_pagina(boton["categoria"], boton["paso"])
+                self.pausa_feedback()
+                break
+
+        # Dibujar tira de mensaje y atender sus botones
+        self.dibujar_tira((cursor_x, cursor_y))
+        for boton in self.botones_tira:
+            if boton["rect"].collidepoint(cursor_x, cursor_y) and clic_activo:
+                if "celda" in boton:
+                    self.seleccionar_simbolo(boton["celda"], origen="sugerencia")
+                else:
+                    boton["accion"]()
+                self.pausa_feedback()
+                break
+
+        # Dibujar barra inferior
+        barra_inferior = self.geometria.barra
+        pygame.draw.rect(self.pantalla, self.COLOR_BARRA_INFERIOR, barra_inferior)
+        pygame.draw.rect(self.pantalla, NEGRO, barra_inferior, width=1)
+
+        # Dibujar botones de la barra
+        for boton in self.botones_barra:
+            self.dibujar_boton_barra(boton, (cursor_x, cursor_y))
+
+            # Manejar clics en botones de la barra
+            if boton["rect"].collidepoint(cursor_x, cursor_y) and clic_activo:
+                self.registro.registrar("accion_barra", accion=boton["icono"])
+                boton["accion"]()
+                self.pausa_feedback()
+
+        # Dibujar cursor de la cámara
+        try:
+            x_final, y_final = self.camara.dibujar_puntero(self.pantalla, cursor_x, cursor_y)
+            pygame.draw.circle(self.pantalla, ROJO, (x_final, y_final), 8, 2)
+        except Exception as e:
+            print(f"Error dibujando cursor: {e}")
+            pygame.draw.circle(self.pantalla, ROJO, (cursor_x, cursor_y), 10, 2)
+            pygame.draw.line(self.pantalla, ROJO, (cursor_x - 15, cursor_y), (cursor_x + 15, cursor_y), 2)
+            pygame.draw.line(self.pantalla, ROJO, (cursor_x, cursor_y - 15), (cursor_x, cursor_y + 15), 2)
+
+    def _esperar_eventos_reposo(self):
+        """En reposo, dormir hasta un evento o hasta el próximo sondeo de la cámara"""
+        evento = pygame.event.wait(int(self.intervalo_sondeo_reposo * 1000))
+        if evento.type == pygame.NOEVENT:
+            return []
+        return [evento] + pygame.event.get()
+
+    def _actualizar_reposo(self, detectado, eventos):
+        """Entra o sale del modo reposo; devuelve True si el estado cambió"""
+        ahora = time.time()
+        interaccion = any(evento.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN)
+                          for evento in eventos)
+        if detectado or interaccion:
+            self.ultima_deteccion = ahora
+
+        if self.en_reposo and (detectado or interaccion):
+            self.en_reposo = False
+            print("⚡ Detección: saliendo del modo reposo")
+            self.registro.registrar("reposo", activo=False)
+            return True
+        if not self.en_reposo and ahora - self.ultima_deteccion > self.tiempo_reposo:
+            self.en_reposo = True
+            print("💤 Sin detección: entrando en modo reposo")
+            self.registro.registrar("reposo", activo=True)
+            self.monitor_energia.imprimir()
+            return True
+        return False
+
     def ejecutar(self):
         """Bucle principal de la aplicación"""
+        pygame.display.set_caption("SIMUS.MJN - Comunicación Aumentativa")
         reloj = pygame.time.Clock()
         ejecutando = True
+        self.activa = True
+        self.usuario_cambiado()  # Otra pantalla pudo cambiar el usuario de la cámara compartida
+
+        while ejecutando and self.activa:
+            self.monitor_energia.registrar(self.en_reposo)
+            eventos = self._esperar_eventos_reposo() if self.en_reposo else None
 
-        while ejecutando:
             # Obtener posición del cursor y estado del clic desde la cámara
             try:
                 cursor_x, cursor_y, clic_camara = self.camara.obtener_posicion_y_clic()
-                if clic_camara and not self.control_clic:
-                    clic_activo = True
-                    self.control_clic = True
-                elif not clic_camara:
-                    self.control_clic = False
-                    clic_activo = False
+                clic_activo = self.actualizar_clic(clic_camara)
+                detectado = self.camara.inactividad == 0
             except Exception as e:
                 print(f"Error cámara: {e}")
                 cursor_x, cursor_y = pygame.mouse.get_pos()
                 clic_activo = pygame.mouse.get_pressed()[0]
+                detectado = False
 
             # Manejar eventos
-            for evento in pygame.event.get():
-                if evento.type == pygame.QUIT:
-                    ejecutando = False
-                elif evento.type == pygame.KEYDOWN:
-                    if evento.key == pygame.K_ESCAPE:
-                        ejecutando = False
-
-            # Dibujar fondo
-            self.pantalla.fill(self.COLOR_FONDO)
-
-            # Dibujar cuadro principal blanco con borde azul
-            cuadro_principal = pygame.Rect(29, 26, 1383, 879)
-            pygame.draw.rect(self.pantalla, self.COLOR_BLANCO, cuadro_principal, border_radius=58)
-            pygame.draw.rect(self.pantalla, self.COLOR_AZUL, cuadro_principal, width=3, border_radius=58)
-
-            # Dibujar cuadros de comunicación
-            for cuadro in self.cuadros:
-                self.dibujar_cuadro(cuadro)
-
-            # Dibujar botones de comunicación
-            for boton in self.botones_comunicacion:
-                self.dibujar_boton_comunicacion(boton, (cursor_x, cursor_y))
-
-                # Manejar clics en botones de comunicación
-                if boton["rect"].collidepoint(cursor_x, cursor_y) and clic_activo:
-                    if "texto" in boton:
-                        self.decir_texto(boton["texto"])
-                    pygame.time.delay(200)  # Pequeña pausa para feedback
-
-            # Dibujar barra inferior
-            barra_inferior = pygame.Rect(0, self.ALTO - 119, self.ANCHO, 119)
-            pygame.draw.rect(self.pantalla, self.COLOR_BARRA_INFERIOR, barra_inferior)
-            pygame.draw.rect(self.pantalla, NEGRO, barra_inferior, width=1)
-
-            # Dibujar botones de la barra
-            for boton in self.botones_barra:
-                self.dibujar_boton_barra(boton, (cursor_x, cursor_y))
-
-                # Manejar clics en botones de la barra
-                if boton["rect"].collidepoint(cursor_x, cursor_y) and clic_activo:
-                    boton["accion"]()
-                    pygame.time.delay(200)  # Pequeña pausa para feedback
+            if eventos is None:
+                eventos = pygame.event.get()
+            ejecutando = self.manejar_eventos(eventos)
 
-            # Dibujar cursor de la cámara
-            try:
-                x_final, y_final = self.camara.dibujar_puntero(self.pantalla, cursor_x, cursor_y)
-                pygame.draw.circle(self.pantalla, ROJO, (x_final, y_final), 8, 2)
-            except Exception as e:
-                print(f"Error dibujando cursor: {e}")
-                pygame.draw.circle(self.pantalla, ROJO, (cursor_x, cursor_y), 10, 2)
-                pygame.draw.line(self.pantalla, ROJO, (cursor_x - 15, cursor_y), (cursor_x + 15, cursor_y), 2)
-                pygame.draw.line(self.pantalla, ROJO, (cursor_x, cursor_y - 15), (cursor_x, cursor_y + 15), 2)
+            cambio_estado = self._actualizar_reposo(detectado, eventos)
+
+            # En reposo sólo se redibuja ante eventos o al cambiar de estado
+            if not self.en_reposo or eventos or cambio_estado:
+                self.dibujar_interfaz(cursor_x, cursor_y, clic_activo)
 
-            # Actualizar pantalla
-            pygame.display.flip()
-            reloj.tick(60)
+                # Actualizar pantalla
+                pygame.display.flip()
+
+            if not self.en_reposo:
+                reloj.tick(60)
+
+        self.finalizar()
+
+    def descartar(self):
+        """Libera los recursos propios de la pantalla cuando el gestor la saca de su caché"""
+        self.vocabulario.cerrar()
+
+    def finalizar(self):
+        """Cierra la pantalla al terminar su bucle"""
+        self.monitor_energia.imprimir()
+
+        # Si la pantalla terminó por un cambio de pantalla, el gestor sigue usando los recursos
+        if not self.activa:
+            return
 
         # Liberar recursos al salir
-        self.camara.liberar_recursos()
+        if self.camara_propia:
+            self.camara.liberar_recursos()
+        if self.registro_propio:
+            self.registro.cerrar()
+        self.descartar()
 
 
 # Ejecutar la aplicación
 if __name__ == "__main__":
-    inicio = Inicio()
-    inicio.ejecutar()
+    from GestorPantallas import GestorPantallas
+
+    gestor = GestorPantallas()
+    gestor.registrar("inicio", Inicio, siguientes=["juegos", "configuracion", "instrucciones"])
+    if "--asincrono" in sys.argv:
+        import asyncio
+
+        asyncio.run(gestor.ejecutar_asincrono("inicio"))
+    else:
+        gestor.ejecutar("inicio")
     pygame.quit()
     sys.exit()
\ No newline at end of file
@@ -1,20 +1,35 @@
 import cv2
 import mediapipe as mp
 import pygame
-import math
 import sys
 import time
 import numpy as np
-from collections import deque
 from Variables_globales import *
+from ServidorInferencia import ClienteInferencia, MODO_MANOS, MODO_ROSTRO
+from Gestos import ReconocedorGestos, PINZA, NINGUNO
+from Perfiles import AlmacenPerfiles, CAMPOS_PERFIL, USUARIO_PREDETERMINADO
+from Parpadeo import DetectorParpadeo, calcular_ear
 
 
 class ManejoCamara:
-    def __init__(self, ancho=1620, alto=900, usocam=None, modo_ocular=False):
+    def __init__(self, ancho=1620, alto=900, usocam=None, modo_ocular=False, servidor_inferencia=None,
+                 reutilizar_buffers=True, fuente_rgb=False, usuario=None, carpeta_perfiles="perfiles",
+                 registro=None):
         self.ancho = ancho
         self.alto = alto
         self.usocam = usocam
+        self.registro = registro  # RegistroEventos opcional para el historial de uso
         self.modo_ocular = modo_ocular
+
+        # Buffers de marco reutilizados entre lecturas (evita asignar varios MB por marco)
+        self.reutilizar_buffers = reutilizar_buffers
+        self.fuente_rgb = fuente_rgb  # La fuente ya entrega RGB: no convertir
+        self.marco_bgr = None
+        self.marco_rgb = None
+
+        # Tras una pausa entre lecturas (modo reposo) la cámara tiene marcos viejos encolados
+        self.pausa_lectura = 0.2
+        self.ultima_lectura = 0
         self.clic_sostenido = False
         self.tiempo_inicio_clic = 0
         self.tiempo_ultimo_parpadeo = 0
@@ -24,29 +39,26 @@ class ManejoCamara:
         # Inicializar cámara
         self.camara = self._inicializar_camara()
 
-        # Inicializar detección de manos
-        self.mp_manos = mp.solutions.hands
-        self.manos = self.mp_manos.Hands(
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7
-        )
-
-        # Inicializar detección de rostro y ojos
-        self.mp_rostro = mp.solutions.face_mesh
-        self.rostro = self.mp_rostro.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        # Usar el servidor de inferencia compartido si se indicó su socket
+        self.cliente_inferencia = None
+        if servidor_inferencia is not None:
+            try:
+                self.cliente_inferencia = ClienteInferencia(servidor_inferencia)
+                self.manos = self.cliente_inferencia.modelo(MODO_MANOS)
+                self.rostro = self.cliente_inferencia.modelo(MODO_ROSTRO)
+            except OSError as e:
+                print(f"⚠️ Servidor de inferencia no disponible ({e}), usando modelos locales")
+        if self.cliente_inferencia is None:
+            self._crear_modelos_locales()
 
         # Variables de estado
         self.cursor_x = self.ancho // 2
         self.cursor_y = self.alto // 2
         self.clic_activo = False
         self.inactividad = 0
-        self.umbral_clic = 0.02
+        self.umbral_clic = 0.25  # Distancia pulgar-índice en unidades de palma
+        self.reconocedor_gestos = ReconocedorGestos(umbral_pinza=self.umbral_clic)
+        self.gesto = NINGUNO
 
         # Para suavizado del movimiento
         self.suavizado = 0.3
@@ -61,8 +73,8 @@ class ManejoCamara:
         self.INDICES_OJO_IZQUIERDO = [33, 160, 158, 133, 153, 144]
         self.INDICES_OJO_DERECHO = [362, 385, 387, 263, 373, 380]
 
-        # Para estabilización del EAR
-        self.historial_ear = deque(maxlen=5)
+        # Detección de parpadeo con umbral adaptativo (parte de UMBRAL_EAR)
+        self.detector_parpadeo = DetectorParpadeo(umbral_inicial=self.UMBRAL_EAR)
         self.ear_suavizado = 0
 
         # Para el área restringida del puntero
@@ -76,6 +88,18 @@ class ManejoCamara:
         self.sensibilidad = 0.5  # Factor de sensibilidad
         self.centro_cabeza = [0.5, 0.5]  # Posición central de la cabeza
 
+        # Perfiles por usuario: se carga el indicado, el último usado en esta estación
+        # o el usuario predeterminado de la estación
+        self.perfil_predeterminado = self.exportar_perfil()
+        self.almacen_perfiles = AlmacenPerfiles(carpeta_perfiles)
+        self.usuario = usuario or self.almacen_perfiles.ultimo_usuario() or USUARIO_PREDETERMINADO
+        perfil = self.almacen_perfiles.cargar(self.usuario)
+        if perfil:
+            self.aplicar_perfil(perfil)
+            print(f"👤 Perfil de {self.usuario} cargado")
+        else:
+            self.guardar_perfil()
+
     def _inicializar_camara(self):
         """Inicializa y configura la cámara"""
         if self.usocam is not None:
@@ -88,9 +112,52 @@ class ManejoCamara:
 
         camara.set(cv2.CAP_PROP_FRAME_WIDTH, self.ancho)
         camara.set(cv2.CAP_PROP_FRAME_HEIGHT, self.alto)
+        # Cola de un solo marco donde el backend lo permite (V4L2, DirectShow)
+        camara.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
         return camara
 
+    def vaciar_buffer(self, max_marcos=10):
+        """Descarta los marcos encolados para que la próxima lectura sea actual"""
+        for _ in range(max_marcos):
+            inicio = time.perf_counter()
+            if not self.camara.grab():
+                break
+            # Un grab() que tuvo que esperar entregó un marco recién capturado: ya no quedan viejos
+            if time.perf_counter() - inicio > 0.01:
+                break
+
+    def _crear_modelos_locales(self):
+        # Inicializar detección de manos
+        self.mp_manos = mp.solutions.hands
+        self.manos = self.mp_manos.Hands(
+            max_num_hands=1,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7
+        )
+
+        # Inicializar detección de rostro y ojos
+        self.mp_rostro = mp.solutions.face_mesh
+        self.rostro = self.mp_rostro.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    def _procesar(self, nombre_modelo, marco_rgb):
+        """Ejecuta manos o rostro; si se pierde el servidor de inferencia pasa a modelos locales"""
+        try:
+            return getattr(self, nombre_modelo).process(marco_rgb)
+        except OSError as e:
+            if self.cliente_inferencia is None:
+                raise
+            print(f"⚠️ Servidor de inferencia no disponible ({e}), usando modelos locales")
+            self.cliente_inferencia.cerrar()
+            self.cliente_inferencia = None
+            self._crear_modelos_locales()
+            return getattr(self, nombre_modelo).process(marco_rgb)
+
     def _detectar_camara_disponible(self, max_camaras=5):
         """Detecta la primera cámara disponible"""
         for i in range(max_camaras):
@@ -101,6 +168,80 @@ class ManejoCamara:
             camara.release()
         raise RuntimeError("No se encontró ninguna cámara disponible")
 
+    def _leer_marco_rgb(self):
+        """Lee un marco de la cámara y lo devuelve en RGB, de sólo lectura"""
+        ahora = time.time()
+        if ahora - self.ultima_lectura > self.pausa_lectura:
+            self.vaciar_buffer()
+        self.ultima_lectura = ahora
+
+        if not self.reutilizar_buffers:
+            ret, marco = self.camara.read()
+            if not ret:
+                return None
+            self.marco_bgr = marco  # Sólo como referencia para medir_asignaciones
+            return marco if self.fuente_rgb else cv2.cvtColor(marco, cv2.COLOR_BGR2RGB)
+
+        # read() rellena el arreglo existente si el tamaño coincide
+        if self.marco_bgr is not None:
+            self.marco_bgr.flags.writeable = True
+        ret, marco = self.camara.read(self.marco_bgr)
+        if not ret:
+            return None
+        self.marco_bgr = marco
+
+        if self.fuente_rgb:
+            marco.flags.writeable = False
+            return marco
+
+        if self.marco_rgb is None or self.marco_rgb.shape != marco.shape:
+            self.marco_rgb = np.empty_like(marco)
+
+        self.marco_rgb.flags.writeable = True
+        cv2.cvtColor(marco, cv2.COLOR_BGR2RGB, dst=self.marco_rgb)
+        # MediaPipe no hace copia defensiva de arreglos de sólo lectura
+        self.marco_rgb.flags.writeable = False
+        return self.marco_rgb
+
+    def medir_asignaciones(self, marcos=100):
+        """Compara la memoria asignada por marco con y sin buffers reutilizados"""
+        import tracemalloc
+
+        modo_original = self.reutilizar_buffers
+        resultados = {}
+        for reutilizar in (False, True):
+            self.reutilizar_buffers = reutilizar
+            self._leer_marco_rgb()  # Preparar buffers fuera de la medición
+
+            tracemalloc.start()
+            bytes_totales = 0
+            arreglos_nuevos = 0
+            anterior_bgr = self.marco_bgr
+            anterior_rgb = self.marco_rgb
+            for _ in range(marcos):
+                inicial = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                marco_rgb = self._leer_marco_rgb()
+                bytes_totales += tracemalloc.get_traced_memory()[1] - inicial
+                if marco_rgb is None:
+                    continue
+                # Contar por separado el marco leído (BGR) y el convertido (RGB)
+                if self.marco_bgr is not anterior_bgr:
+                    arreglos_nuevos += 1
+                if marco_rgb is not anterior_rgb and marco_rgb is not self.marco_bgr:
+                    arreglos_nuevos += 1
+                anterior_bgr = self.marco_bgr
+                anterior_rgb = marco_rgb
+            tracemalloc.stop()
+
+            resultados[reutilizar] = (bytes_totales / marcos, arreglos_nuevos / marcos)
+
+        self.reutilizar_buffers = modo_original
+        for reutilizar, (bytes_marco, arreglos_marco) in resultados.items():
+            modo = "reutilizados" if reutilizar else "nuevos"
+            print(f"📊 Buffers {modo}: {bytes_marco / 1024:.1f} KiB y {arreglos_marco:.2f} arreglos nuevos por marco")
+        return resultados
+
     def calibrar(self, duracion=3):
         """Calibra el rango de movimiento de la cabeza"""
         print("🔧 Calibrando... Por favor, mueve la cabeza en todas direcciones")
@@ -110,12 +251,11 @@ class ManejoCamara:
         rangos_y = []
 
         while time.time() - tiempo_inicio < duracion:
-            ret, marco = self.camara.read()
-            if not ret:
+            marco_rgb = self._leer_marco_rgb()
+            if marco_rgb is None:
                 continue
 
-            marco_rgb = cv2.cvtColor(marco, cv2.COLOR_BGR2RGB)
-            resultados = self.rostro.process(marco_rgb)
+            resultados = self._procesar("rostro", marco_rgb)
 
             if resultados.multi_face_landmarks:
                 landmarks = resultados.multi_face_landmarks[0]
@@ -131,24 +271,17 @@ class ManejoCamara:
             self.rango_cabeza_y = [min(rangos_y), max(rangos_y)]
             self.centro_cabeza = [np.mean(rangos_x), np.mean(rangos_y)]
             self.calibrado = True
+            self.guardar_perfil()
+            self._registrar("calibracion", exito=True, rango_x=[float(v) for v in self.rango_cabeza_x],
+                            rango_y=[float(v) for v in self.rango_cabeza_y])
             print(f"✅ Calibración completada. Rango X: {self.rango_cabeza_x}, Rango Y: {self.rango_cabeza_y}")
         else:
             print("⚠️ No se detectó rostro durante la calibración. Usando valores por defecto.")
+            self._registrar("calibracion", exito=False)
 
     def _calcular_ear(self, landmarks, indices):
         """Calcula la Relación de Aspecto del Ojo (EAR) para un ojo"""
-        puntos = [landmarks.landmark[i] for i in indices]
-
-        vertical1 = math.sqrt((puntos[1].x - puntos[5].x) ** 2 + (puntos[1].y - puntos[5].y) ** 2)
-        vertical2 = math.sqrt((puntos[2].x - puntos[4].x) ** 2 + (puntos[2].y - puntos[4].y) ** 2)
-
-        horizontal = math.sqrt((puntos[0].x - puntos[3].x) ** 2 + (puntos[0].y - puntos[3].y) ** 2)
-
-        if horizontal == 0:
-            return 0.0
-
-        ear = (vertical1 + vertical2) / (2.0 * horizontal)
-        return ear
+        return calcular_ear(landmarks, indices)
 
     def _detectar_parpadeo_ear(self, landmarks):
         """Detecta parpadeos usando la Relación de Aspecto del Ojo"""
@@ -157,11 +290,13 @@ class ManejoCamara:
 
         ear = (ear_izquierdo + ear_derecho) / 2.0
 
-        self.historial_ear.append(ear)
-        self.ear_suavizado = sum(self.historial_ear) / len(self.historial_ear) if self.historial_ear else ear
+        # Umbral aprendido de la distribución de EAR del usuario, inicio por derivada
+        parpadeo_actual = self.detector_parpadeo.actualizar(ear)
+        self.ear_suavizado = self.detector_parpadeo.ear_filtrado
+        if self.detector_parpadeo.listo:
+            self.UMBRAL_EAR = self.detector_parpadeo.umbral
 
         tiempo_actual = time.time()
-        parpadeo_actual = self.ear_suavizado < self.UMBRAL_EAR
 
         # Detectar inicio de parpadeo
         if parpadeo_actual and not self.parpadeo_detectado:
@@ -220,9 +355,13 @@ class ManejoCamara:
 
     def _obtener_posicion_manos(self, marco_rgb):
         """Obtiene posición usando las manos"""
-        resultados = self.manos.process(marco_rgb)
+        resultados = self._procesar("manos", marco_rgb)
         clic_activo = False
 
+        if getattr(resultados, "descartado", False):
+            # El servidor de inferencia descartó el marco: mantener el estado anterior
+            return self.cursor_x, self.cursor_y, self.gesto == PINZA
+
         if resultados.multi_hand_landmarks:
             self.inactividad = 0
             landmarks = resultados.multi_hand_landmarks[0]
@@ -239,18 +378,25 @@ class ManejoCamara:
             self.cursor_x = int(self.cursor_x * (1 - self.suavizado) + x_virtual * self.suavizado)
             self.cursor_y = int(self.cursor_y * (1 - self.suavizado) + y_virtual * self.suavizado)
 
-            distancia = math.sqrt((indice.x - pulgar.x) ** 2 + (indice.y - pulgar.y) ** 2)
-            clic_activo = distancia < self.umbral_clic
+            puntos = np.array([(p.x, p.y, p.z) for p in landmarks.landmark], dtype=np.float32)
+            self.gesto = self.reconocedor_gestos.actualizar(puntos, umbral_pinza=self.umbral_clic)
+            clic_activo = self.gesto == PINZA
         else:
             self.inactividad += 1
+            self.reconocedor_gestos.reiniciar()
+            self.gesto = NINGUNO
 
         return self.cursor_x, self.cursor_y, clic_activo
 
     def _obtener_posicion_ojos(self, marco_rgb):
         """Obtiene posición usando los ojos"""
-        resultados = self.rostro.process(marco_rgb)
+        resultados = self._procesar("rostro", marco_rgb)
         clic_activo = self.clic_sostenido  # Usar el estado de clic sostenido
 
+        if getattr(resultados, "descartado", False):
+            # El servidor de inferencia descartó el marco: mantener el estado anterior
+            return self.cursor_x, self.cursor_y, clic_activo
+
         if resultados.multi_face_landmarks:
             self.inactividad = 0
             landmarks = resultados.multi_face_landmarks[0]
@@ -282,35 +428,46 @@ class ManejoCamara:
         self.parpadeo_detectado = False
         self.tiempo_inicio_clic = 0
 
+    def _registrar(self, tipo, **datos):
+        if self.registro:
+            self.registro.registrar(tipo, modo="ojos" if self.modo_ocular else "manos", usuario=self.usuario, **datos)
+
     def obtener_posicion_y_clic(self):
         """Obtiene la posición del cursor y estado del clic"""
-        ret, marco = self.camara.read()
-        if not ret:
+        marco_rgb = self._leer_marco_rgb()
+        if marco_rgb is None:
             return self.cursor_x, self.cursor_y, False
 
-        marco_rgb = cv2.cvtColor(marco, cv2.COLOR_BGR2RGB)
-
+        inactividad_anterior = self.inactividad
         if self.modo_ocular:
             x, y, clic = self._obtener_posicion_ojos(marco_rgb)
 
             # Para debug: mostrar estado del clic
             if hasattr(self, 'debug') and self.debug:
                 print(f"CLIC: {clic}, Sostenido: {self.clic_sostenido}, Parpadeo: {self.parpadeo_detectado}")
-
-            return x, y, clic
         else:
-            return self._obtener_posicion_manos(marco_rgb)
+            x, y, clic = self._obtener_posicion_manos(marco_rgb)
+
+        # Registrar sólo las transiciones entre seguimiento y pérdida
+        if inactividad_anterior == 0 and self.inactividad > 0:
+            self._registrar("perdida_seguimiento")
+        elif inactividad_anterior > 0 and self.inactividad == 0:
+            self._registrar("seguimiento_recuperado", marcos_perdidos=inactividad_anterior)
+
+        return x, y, clic
 
     def ajustar_sensibilidad(self, factor):
         """Ajusta la sensibilidad del movimiento ocular"""
         self.sensibilidad = max(0.5, min(5.0, self.sensibilidad * factor))
         print(f"🔧 Sensibilidad ajustada a: {self.sensibilidad:.2f}")
+        self.guardar_perfil()
 
     def cambiar_modo(self):
         """Cambia entre modo mano y modo ocular"""
         self.modo_ocular = not self.modo_ocular
         modo = "OCULAR" if self.modo_ocular else "MANOS"
         print(f"🔁 Modo cambiado a: {modo}")
+        self._registrar("cambio_modo")
 
         # Calibrar automáticamente al cambiar a modo ocular
         if self.modo_ocular and not self.calibrado:
@@ -318,6 +475,70 @@ class ManejoCamara:
 
         return self.modo_ocular
 
+    def exportar_perfil(self):
+        """Devuelve los ajustes de seguimiento actuales como diccionario serializable"""
+        perfil = {"modelo_parpadeo": self.detector_parpadeo.exportar()}
+        for campo in CAMPOS_PERFIL:
+            if campo == "modelo_parpadeo":
+                continue
+            valor = getattr(self, campo)
+            if isinstance(valor, (list, tuple)):
+                valor = [float(v) for v in valor]
+            elif not isinstance(valor, bool):
+                valor = float(valor)
+            perfil[campo] = valor
+        return perfil
+
+    def aplicar_perfil(self, perfil):
+        """Aplica un perfil en caliente, sin recrear modelos ni reabrir la cámara"""
+        for campo in CAMPOS_PERFIL:
+            if campo == "modelo_parpadeo":
+                continue
+            valor = perfil.get(campo, self.perfil_predeterminado[campo])
+            setattr(self, campo, list(valor) if isinstance(valor, list) else valor)
+
+        # El estado de seguimiento del usuario anterior no aplica al nuevo; sus modos
+        # de parpadeo aprendidos sí, para no repetir el calentamiento
+        self.detector_parpadeo.reiniciar(self.UMBRAL_EAR, perfil.get("modelo_parpadeo"))
+        self.reconocedor_gestos.reiniciar()
+        self.resetear_clic()
+
+    def guardar_perfil(self):
+        """Guarda los ajustes actuales en el perfil del usuario activo"""
+        if not self.usuario:
+            return
+        try:
+            self.almacen_perfiles.guardar(self.usuario, self.exportar_perfil())
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el perfil de {self.usuario}: {e}")
+
+    def cambiar_usuario(self, usuario):
+        """Cambia al perfil de otro usuario; si no existe, parte de los valores por defecto"""
+        self.guardar_perfil()
+        self.usuario = usuario
+        perfil = self.almacen_perfiles.cargar(usuario)
+        self.aplicar_perfil(perfil or self.perfil_predeterminado)
+        self.guardar_perfil()
+        estado = "cargado" if perfil else "nuevo"
+        print(f"👤 Usuario {usuario} ({estado})")
+        self._registrar("cambio_usuario", nuevo=perfil is None)
+
+    def siguiente_usuario(self):
+        """Pasa al siguiente usuario con perfil guardado"""
+        usuarios = self.almacen_perfiles.listar()
+        if not usuarios or usuarios == [self.usuario]:
+            return
+        indice = usuarios.index(self.usuario) + 1 if self.usuario in usuarios else 0
+        self.cambiar_usuario(usuarios[indice % len(usuarios)])
+
+    def nuevo_usuario(self):
+        """Crea un usuario nuevo con los valores por defecto y pasa a él"""
+        self.cambiar_usuario(self.almacen_perfiles.nombre_libre())
+
+    def ruta_historial(self):
+        """Historial de mensajes del usuario activo"""
+        return self.almacen_perfiles.ruta_historial(self.usuario)
+
     def dibujar_puntero(self, pantalla, x, y):
         """Dibuja el puntero en la pantalla"""
         izquierda = (self.ancho - self.area_ancho) // 2
@@ -360,8 +581,12 @@ class ManejoCamara:
         texto_inact = fuente.render(f"Inactividad: {inactividad}", True, BLANCO)
         pantalla.blit(texto_inact, (10, 130))
 
+        if not self.modo_ocular:
+            texto_gesto = fuente.render(f"Gesto: {self.gesto}", True, BLANCO)
+            pantalla.blit(texto_gesto, (10, 170))
+
         if self.modo_ocular:
-            texto_ear = fuente.render(f"EAR: {self.ear_suavizado:.3f}", True, BLANCO)
+            texto_ear = fuente.render(f"EAR: {self.ear_suavizado:.3f} Umbral: {self.UMBRAL_EAR:.3f}", True, BLANCO)
             pantalla.blit(texto_ear, (10, 170))
 
             texto_sens = fuente.render(f"Sensibilidad: {self.sensibilidad:.2f}", True, BLANCO)
@@ -377,6 +602,8 @@ class ManejoCamara:
             self.manos.close()
         if hasattr(self, 'rostro') and self.rostro:
             self.rostro.close()
+        if getattr(self, 'cliente_inferencia', None):
+            self.cliente_inferencia.cerrar()
         if hasattr(self, 'camara') and self.camara.isOpened():
             self.camara.release()
 
@@ -407,6 +634,9 @@ def main():
     print("🤏 Junta pulgar e índice para hacer clic o parpadea en modo ocular")
     print("M: Cambiar entre modos")
     print("C: Calibrar modo ocular")
+    print("A: Medir asignaciones de memoria por marco")
+    print("U: Cambiar al siguiente usuario")
+    print("N: Crear un usuario nuevo")
     print("+/-: Ajustar sensibilidad")
 
     while ejecutando:
@@ -420,6 +650,12 @@ def main():
                     manejador.cambiar_modo()
                 elif evento.key == pygame.K_c:
                     manejador.calibrar()
+                elif evento.key == pygame.K_a:
+                    manejador.medir_asignaciones()
+                elif evento.key == pygame.K_u:
+                    manejador.siguiente_usuario()
+                elif evento.key == pygame.K_n:
+                    manejador.nuevo_usuario()
                 elif evento.key == pygame.K_PLUS or evento.key == pygame.K_KP_PLUS:
                     manejador.ajustar_sensibilidad(1.2)
                 elif evento.key == pygame.K_MINUS or evento.key == pygame.K_KP_MINUS:
@@ -0,0 +1,328 @@
+import sys
+import csv
+import math
+import time
+import random
+from collections import deque
+
+
+INDICES_OJO_IZQUIERDO = [33, 160, 158, 133, 153, 144]
+INDICES_OJO_DERECHO = [362, 385, 387, 263, 373, 380]
+
+# Estado de DetectorParpadeo que se guarda en el perfil del usuario
+CAMPOS_MODELO = ["media_abierto", "var_abierto", "media_cerrado", "var_cerrado", "peso_cerrado"]
+
+
+def calcular_ear(landmarks, indices):
+    """Calcula la Relación de Aspecto del Ojo (EAR) para un ojo"""
+    puntos = [landmarks.landmark[i] for i in indices]
+
+    vertical1 = math.sqrt((puntos[1].x - puntos[5].x) ** 2 + (puntos[1].y - puntos[5].y) ** 2)
+    vertical2 = math.sqrt((puntos[2].x - puntos[4].x) ** 2 + (puntos[2].y - puntos[4].y) ** 2)
+
+    horizontal = math.sqrt((puntos[0].x - puntos[3].x) ** 2 + (puntos[0].y - puntos[3].y) ** 2)
+
+    if horizontal == 0:
+        return 0.0
+
+    return (vertical1 + vertical2) / (2.0 * horizontal)
+
+
+class DetectorParpadeo:
+    """Detecta parpadeos con un umbral de EAR aprendido en línea para cada usuario
+
+    Los primeros marcos son un calentamiento: su mediana y dispersión definen el modo
+    del ojo abierto (el ojo está abierto la mayor parte del tiempo) y el modo cerrado
+    parte de una fracción de ese valor, así que no depende de un umbral absoluto.
+    Mientras tanto se detecta con umbral_inicial (el umbral guardado en el perfil).
+    Los modos aprendidos se pueden exportar y restaurar para no recalentar.
+    Después ambos modos se ajustan con un EM en línea de dos gaussianas (asignación
+    suave por responsabilidad). El umbral queda entre ambos modos, con histéresis
+    para cerrar y abrir, y el inicio del parpadeo se detecta por la caída brusca del
+    EAR (derivada) sin esperar a un promedio retrasado.
+    """
+
+    def __init__(self, umbral_inicial=0.21, alfa=0.02, muestras_minimas=60,
+                 factor_histeresis=0.15, factor_derivada=0.3, fraccion_cerrado=0.45):
+        self.umbral_inicial = umbral_inicial
+        self.alfa = alfa
+        self.muestras_minimas = muestras_minimas
+        self.factor_histeresis = factor_histeresis
+        self.factor_derivada = factor_derivada
+        self.fraccion_cerrado = fraccion_cerrado
+        self.reiniciar(umbral_inicial)
+
+    def reiniciar(self, umbral_inicial=None, modelo=None):
+        """Vuelve al calentamiento o a los modos de un modelo exportado (p. ej. al cambiar de usuario)"""
+        if umbral_inicial is not None:
+            self.umbral_inicial = umbral_inicial
+
+        self.calentamiento = []
+        self.media_abierto = self.media_cerrado = None
+        self.var_abierto = self.var_cerrado = None
+        self.peso_cerrado = 0.05
+        self.muestras = 0
+        if modelo:
+            for campo in CAMPOS_MODELO:
+                setattr(self, campo, float(modelo[campo]))
+            self._limitar()
+
+        self.ear_filtrado = None
+        self.derivada = 0.0
+        self.cerrado = False
+
+    def exportar(self):
+        """Modos aprendidos como diccionario serializable, o None durante el calentamiento"""
+        if not self.listo:
+            return None
+        return {campo: float(getattr(self, campo)) for campo in CAMPOS_MODELO}
+
+    @property
+    def listo(self):
+        return self.media_abierto is not None
+
+    @property
+    def umbral(self):
+        """Punto entre ambos modos ponderado por su dispersión"""
+        if not self.listo:
+            return self.umbral_inicial
+        de_abierto = self.var_abierto ** 0.5
+        de_cerrado = self.var_cerrado ** 0.5
+        return (self.media_abierto * de_cerrado + self.media_cerrado * de_abierto) / (de_abierto + de_cerrado)
+
+    def _sembrar(self):
+        """Modos iniciales a partir de las muestras del calentamiento"""
+        muestras = sorted(self.calentamiento)
+        mediana = muestras[len(muestras) // 2]
+        desviacion = sorted(abs(m - mediana) for m in muestras)[len(muestras) // 2]
+        de_abierto = max(1.4826 * desviacion, 0.02 * mediana, 1e-3)
+
+        self.media_abierto = mediana
+        self.var_abierto = de_abierto ** 2
+
+        # Parpadeos que hayan caído en el calentamiento; si no hay, una fracción del ojo abierto
+        cerradas = [m for m in muestras if m < mediana - 5 * de_abierto]
+        if len(cerradas) >= 3:
+            self.media_cerrado = sum(cerradas) / len(cerradas)
+            self.peso_cerrado = len(cerradas) / len(muestras)
+        else:
+            self.media_cerrado = self.fraccion_cerrado * mediana
+        self.var_cerrado = max(de_abierto, 0.1 * mediana) ** 2
+        self._limitar()
+        self.calentamiento = []
+
+    def _limitar(self):
+        # Evitar que los modos se crucen o que uno absorba al otro
+        self.media_cerrado = min(self.media_cerrado, 0.8 * self.media_abierto)
+        maxima = ((self.media_abierto - self.media_cerrado) / 2) ** 2
+        minima = (0.01 * self.media_abierto) ** 2
+        self.var_abierto = min(max(self.var_abierto, minima), maxima)
+        self.var_cerrado = min(max(self.var_cerrado, minima), maxima)
+        self.peso_cerrado = min(max(self.peso_cerrado, 0.01), 0.3)
+
+    def _responsabilidad_cerrado(self, ear):
+        """Probabilidad de que la muestra venga del modo cerrado"""
+        log_abierto = (math.log(1 - self.peso_cerrado) - 0.5 * math.log(self.var_abierto)
+                       - (ear - self.media_abierto) ** 2 / (2 * self.var_abierto))
+        log_cerrado = (math.log(self.peso_cerrado) - 0.5 * math.log(self.var_cerrado)
+                       - (ear - self.media_cerrado) ** 2 / (2 * self.var_cerrado))
+        return 1 / (1 + math.exp(max(-50.0, min(50.0, log_abierto - log_cerrado))))
+
+    def _aprender(self, ear):
+        self.muestras += 1
+        if not self.listo:
+            self.calentamiento.append(ear)
+            if len(self.calentamiento) >= self.muestras_minimas:
+                self._sembrar()
+            return
+
+        # Paso de EM en línea: cada modo se mueve según su responsabilidad
+        r = self._responsabilidad_cerrado(ear)
+        alfa = self.alfa * (1 - r)
+        diferencia = ear - self.media_abierto
+        self.media_abierto += alfa * diferencia
+        self.var_abierto += alfa * (diferencia ** 2 - self.var_abierto)
+
+        # El ojo cerrado se ve en pocos marcos: aprender más rápido
+        alfa = min(1.0, self.alfa * 5) * r
+        diferencia = ear - self.media_cerrado
+        self.media_cerrado += alfa * diferencia
+        self.var_cerrado += alfa * (diferencia ** 2 - self.var_cerrado)
+
+        self.peso_cerrado += self.alfa * (r - self.peso_cerrado)
+        self._limitar()
+
+    def actualizar(self, ear):
+        """Procesa un valor de EAR y devuelve True mientras el ojo está cerrado"""
+        if self.ear_filtrado is None:
+            self.ear_filtrado = ear
+        anterior = self.ear_filtrado
+        # Filtro ligero: medio marco de retardo en lugar de los dos y medio del promedio de 5
+        self.ear_filtrado = 0.5 * ear + 0.5 * anterior
+        self.derivada = self.ear_filtrado - anterior
+
+        self._aprender(ear)
+        if not self.listo:
+            # Calentamiento: umbral del perfil con una histéresis fija
+            if not self.cerrado and self.ear_filtrado < self.umbral_inicial - 0.01:
+                self.cerrado = True
+            elif self.cerrado and self.ear_filtrado > self.umbral_inicial + 0.01:
+                self.cerrado = False
+            return self.cerrado
+
+        umbral = self.umbral
+        separacion = self.media_abierto - self.media_cerrado
+        histeresis = self.factor_histeresis * separacion
+
+        if not self.cerrado:
+            # La caída debe superar también el ruido propio del ojo abierto
+            caida_minima = max(self.factor_derivada * separacion, 2.5 * self.var_abierto ** 0.5)
+            caida_brusca = self.derivada < -caida_minima
+            if self.ear_filtrado < umbral - histeresis or (caida_brusca and ear < umbral + histeresis):
+                self.cerrado = True
+        elif self.ear_filtrado > umbral + histeresis:
+            self.cerrado = False
+
+        return self.cerrado
+
+
+class DetectorParpadeoFijo:
+    """Detector anterior (promedio de 5 muestras y umbral fijo), para comparar"""
+
+    def __init__(self, umbral=0.21):
+        self.umbral = umbral
+        self.historial = deque(maxlen=5)
+
+    def actualizar(self, ear):
+        self.historial.append(ear)
+        return sum(self.historial) / len(self.historial) < self.umbral
+
+
+def _inicios(serie):
+    """Índices donde una serie booleana pasa de False a True"""
+    return [i for i in range(len(serie)) if serie[i] and (i == 0 or not serie[i - 1])]
+
+
+def evaluar(ruta, umbral_inicial=0.21, tolerancia=0.3):
+    """Compara latencia y falsos positivos de ambos detectores en una sesión grabada
+
+    El CSV tiene columnas tiempo, ear, parpadeo (1 en los marcos anotados como parpadeo).
+    """
+    with open(ruta, newline="") as archivo:
+        filas = [(float(f["tiempo"]), float(f["ear"]), f["parpadeo"] == "1") for f in csv.DictReader(archivo)]
+    if not filas:
+        print("⚠️ La sesión está vacía")
+        return {}
+    return comparar(filas, umbral_inicial, tolerancia)
+
+
+def comparar(filas, umbral_inicial=0.21, tolerancia=0.3):
+    """Compara ambos detectores sobre filas (tiempo, ear, parpadeo anotado)"""
+    tiempos = [f[0] for f in filas]
+    anotados = [f[2] for f in filas]
+    inicios_reales = [tiempos[i] for i in _inicios(anotados)]
+
+    resultados = {}
+    for nombre, detector in (("fijo", DetectorParpadeoFijo(umbral_inicial)),
+                             ("adaptativo", DetectorParpadeo(umbral_inicial))):
+        detecciones = [tiempos[i] for i in _inicios([detector.actualizar(f[1]) for f in filas])]
+
+        latencias = []
+        falsos_positivos = 0
+        pendientes = list(inicios_reales)
+        for t in detecciones:
+            coincidencia = next((r for r in pendientes if r - 0.1 <= t <= r + tolerancia), None)
+            if coincidencia is None:
+                falsos_positivos += 1
+            else:
+                pendientes.remove(coincidencia)
+                latencias.append(t - coincidencia)
+
+        resultados[nombre] = {
+            "detectados": len(latencias),
+            "perdidos": len(pendientes),
+            "falsos_positivos": falsos_positivos,
+            "latencia_media_ms": 1000 * sum(latencias) / len(latencias) if latencias else 0.0,
+        }
+        print(f"📊 {nombre}: {len(latencias)}/{len(inicios_reales)} parpadeos, "
+              f"latencia media {resultados[nombre]['latencia_media_ms']:.0f} ms, "
+              f"{falsos_positivos} falsos positivos")
+    return resultados
+
+
+def sesion_sintetica(ear_abierto, ear_cerrado, ruido, parpadeos=40, fps=30, semilla=0):
+    """Genera filas (tiempo, ear, parpadeo) con parpadeos separados de 2 a 6 segundos"""
+    aleatorio = random.Random(semilla)
+    valores = []
+    for _ in range(parpadeos):
+        valores += [(ear_abierto, False)] * int(aleatorio.uniform(2, 6) * fps)
+        cierre = [ear_abierto + (ear_cerrado - ear_abierto) * f for f in (0.5, 1.0)]
+        cerrado = [ear_cerrado] * aleatorio.randint(3, 6)
+        apertura = [ear_cerrado + (ear_abierto - ear_cerrado) * f for f in (0.33, 0.66, 1.0)]
+        valores += [(v, True) for v in cierre + cerrado + apertura]
+    valores += [(ear_abierto, False)] * (2 * fps)
+    return [(i / fps, ear + aleatorio.gauss(0, ruido), anotado) for i, (ear, anotado) in enumerate(valores)]
+
+
+# Usuarios con EAR de ojo abierto bajo (ojos entrecerrados, ptosis) y alto
+USUARIOS_SINTETICOS = [
+    (0.18, 0.08, 0.01),
+    (0.20, 0.09, 0.01),
+    (0.23, 0.10, 0.015),
+    (0.30, 0.13, 0.015),
+    (0.36, 0.15, 0.02),
+]
+
+
+def evaluar_sinteticas(usuarios=USUARIOS_SINTETICOS):
+    """Compara ambos detectores en sesiones sintéticas de usuarios con EAR bajo y alto"""
+    resultados = {}
+    for abierto, cerrado, ruido in usuarios:
+        print(f"👁️ Ojo abierto {abierto:.2f}, cerrado {cerrado:.2f}, ruido {ruido:.3f}")
+        resultados[(abierto, cerrado, ruido)] = comparar(sesion_sintetica(abierto, cerrado, ruido))
+    return resultados
+
+
+def grabar(ruta, duracion=60, usocam=0):
+    """Graba el EAR de una sesión; mantener ESPACIO mientras el usuario parpadea para anotarlo"""
+    import cv2
+    import mediapipe as mp
+
+    camara = cv2.VideoCapture(usocam)
+    rostro = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True,
+                                             min_detection_confidence=0.5, min_tracking_confidence=0.5)
+    print(f"🎥 Grabando EAR durante {duracion} s (ESPACIO = parpadeo)...")
+
+    with open(ruta, "w", newline="") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(["tiempo", "ear", "parpadeo"])
+        tiempo_inicio = time.time()
+        while time.time() - tiempo_inicio < duracion:
+            ret, marco = camara.read()
+            if not ret:
+                continue
+            resultados = rostro.process(cv2.cvtColor(marco, cv2.COLOR_BGR2RGB))
+            cv2.imshow("Grabacion EAR", marco)
+            anotado = cv2.waitKey(1) & 0xFF == ord(" ")
+            if resultados.multi_face_landmarks:
+                landmarks = resultados.multi_face_landmarks[0]
+                ear = (calcular_ear(landmarks, INDICES_OJO_IZQUIERDO) +
+                       calcular_ear(landmarks, INDICES_OJO_DERECHO)) / 2.0
+                escritor.writerow([f"{time.time() - tiempo_inicio:.4f}", f"{ear:.5f}", int(anotado)])
+
+    rostro.close()
+    camara.release()
+    cv2.destroyAllWindows()
+    print(f"✅ Sesión guardada en {ruta}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "grabar":
+        grabar(sys.argv[2])
+    elif len(sys.argv) > 1 and sys.argv[1] == "sinteticas":
+        evaluar_sinteticas()
+    elif len(sys.argv) > 1:
+        evaluar(sys.argv[1])
+    else:
+        print("Uso: python Parpadeo.py grabar sesion.csv | python Parpadeo.py sesion.csv | "
+              "python Parpadeo.py sinteticas")
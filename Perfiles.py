@@ -0,0 +1,103 @@
+import os
+import json
+import tempfile
+
+
+VERSION_PERFIL = 1
+
+# Usuario de la estación cuando no se eligió ninguno: así la calibración se guarda igual
+USUARIO_PREDETERMINADO = "estacion"
+
+# Atributos de ManejoCamara que forman parte del perfil de un usuario
+CAMPOS_PERFIL = [
+    "modo_ocular",
+    "calibrado",
+    "rango_cabeza_x",
+    "rango_cabeza_y",
+    "centro_cabeza",
+    "sensibilidad",
+    "UMBRAL_EAR",
+    "umbral_clic",
+    "suavizado",
+    "modelo_parpadeo",  # Modos de EAR aprendidos por DetectorParpadeo (None si no hay)
+]
+
+
+def escribir_json_atomico(ruta, datos):
+    """Escribe JSON en un archivo temporal y lo reemplaza de forma atómica"""
+    carpeta = os.path.dirname(ruta) or "."
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+            json.dump(datos, archivo, ensure_ascii=False, indent=4)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, ruta)
+    except Exception:
+        if os.path.exists(temporal):
+            os.unlink(temporal)
+        raise
+
+
+class AlmacenPerfiles:
+    """Guarda un perfil de seguimiento por usuario en archivos JSON versionados"""
+
+    def __init__(self, carpeta="perfiles"):
+        self.carpeta = carpeta
+        os.makedirs(carpeta, exist_ok=True)
+        self.ruta_indice = os.path.join(carpeta, "indice.json")
+
+    def _ruta(self, usuario):
+        return os.path.join(self.carpeta, f"{usuario}.json")
+
+    def ruta_historial(self, usuario):
+        """Historial de mensajes del usuario, del que aprende el predictor de símbolos"""
+        return os.path.join(self.carpeta, f"{usuario}.historial.txt")
+
+    def nombre_libre(self, prefijo="usuario"):
+        """Primer nombre prefijo_N sin perfil guardado"""
+        existentes = set(self.listar())
+        n = 1
+        while f"{prefijo}_{n}" in existentes:
+            n += 1
+        return f"{prefijo}_{n}"
+
+    def listar(self):
+        """Nombres de los usuarios con perfil guardado"""
+        return sorted(nombre[:-5] for nombre in os.listdir(self.carpeta)
+                      if nombre.endswith(".json") and nombre != "indice.json")
+
+    def cargar(self, usuario):
+        """Devuelve el perfil del usuario o None si no existe o no se puede leer"""
+        try:
+            with open(self._ruta(usuario), encoding="utf-8") as archivo:
+                datos = json.load(archivo)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ No se pudo leer el perfil de {usuario}: {e}")
+            return None
+        return self._migrar(datos)
+
+    def guardar(self, usuario, perfil):
+        datos = {"version": VERSION_PERFIL}
+        datos.update({campo: perfil[campo] for campo in CAMPOS_PERFIL if campo in perfil})
+        escribir_json_atomico(self._ruta(usuario), datos)
+        escribir_json_atomico(self.ruta_indice, {"ultimo": usuario})
+
+    def ultimo_usuario(self):
+        """Usuario activo en la última sesión de esta estación"""
+        try:
+            with open(self.ruta_indice, encoding="utf-8") as archivo:
+                return json.load(archivo).get("ultimo")
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _migrar(datos):
+        """Adapta perfiles de versiones anteriores al formato actual"""
+        version = datos.get("version", 0)
+        if version > VERSION_PERFIL:
+            print(f"⚠️ Perfil con versión {version} más nueva que la soportada ({VERSION_PERFIL})")
+        # Versión 0: perfiles sin número de versión, mismos campos
+        return {campo: datos[campo] for campo in CAMPOS_PERFIL if campo in datos}
@@ -0,0 +1,112 @@
+import os
+import sys
+
+
+class PredictorSimbolos:
+    """Sugiere el siguiente símbolo con un índice de n-gramas del historial del usuario
+
+    Cada contexto (los últimos 0, 1 o 2 símbolos del mensaje) guarda sus conteos y
+    un ranking de los k más frecuentes que se mantiene al aprender, así que
+    consultar sugerencias sólo recorre unas pocas listas cortas.
+    """
+
+    def __init__(self, orden=3, k=4, ruta_historial="historial_mensajes.txt"):
+        self.orden = orden
+        self.k = k
+        self.ruta_historial = ruta_historial
+        self.conteos = {}
+        self.ranking = {}
+
+        if ruta_historial and os.path.exists(ruta_historial):
+            for mensaje in leer_historial(ruta_historial):
+                self.aprender(mensaje)
+
+    def _incrementar(self, contexto, simbolo):
+        conteos = self.conteos.setdefault(contexto, {})
+        conteos[simbolo] = conteos.get(simbolo, 0) + 1
+        n = conteos[simbolo]
+
+        ranking = self.ranking.setdefault(contexto, [])
+        if simbolo in ranking:
+            i = ranking.index(simbolo)
+        elif len(ranking) < self.k:
+            ranking.append(simbolo)
+            i = len(ranking) - 1
+        elif n > conteos[ranking[-1]]:
+            ranking[-1] = simbolo
+            i = len(ranking) - 1
+        else:
+            return
+
+        # Subir el símbolo mientras supere al anterior
+        while i > 0 and conteos[ranking[i - 1]] < n:
+            ranking[i - 1], ranking[i] = ranking[i], ranking[i - 1]
+            i -= 1
+
+    def aprender(self, mensaje):
+        """Actualiza el índice con un mensaje completo (lista de nombres de símbolos)"""
+        for i, simbolo in enumerate(mensaje):
+            for n in range(self.orden):
+                if n > i:
+                    break
+                self._incrementar(tuple(mensaje[i - n:i]), simbolo)
+
+    def registrar_mensaje(self, mensaje):
+        """Aprende el mensaje y lo agrega al historial en disco"""
+        if not mensaje:
+            return
+        self.aprender(mensaje)
+        if self.ruta_historial:
+            with open(self.ruta_historial, "a", encoding="utf-8") as archivo:
+                archivo.write(" ".join(mensaje) + "\n")
+
+    def sugerir(self, prefijo, k=None):
+        """Devuelve hasta k símbolos sugeridos tras el prefijo, del contexto más largo al más corto"""
+        k = k or self.k
+        sugerencias = []
+        for n in range(min(self.orden - 1, len(prefijo)), -1, -1):
+            contexto = tuple(prefijo[len(prefijo) - n:]) if n else ()
+            for simbolo in self.ranking.get(contexto, ()):
+                if simbolo not in sugerencias:
+                    sugerencias.append(simbolo)
+                    if len(sugerencias) == k:
+                        return sugerencias
+        return sugerencias
+
+
+def leer_historial(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return [linea.split() for linea in archivo if linea.strip()]
+
+
+def evaluar(ruta_historial, vocabulario, k=4):
+    """Reproduce sesiones grabadas y compara selecciones por mensaje con y sin sugerencias
+
+    Sin sugerencias, elegir un símbolo cuesta una selección más una por cada página
+    que hay que pasar hasta llegar a él; una sugerencia acertada cuesta una.
+    """
+    predictor = PredictorSimbolos(k=k, ruta_historial=None)
+    mensajes = leer_historial(ruta_historial)
+    sin_prediccion = 0
+    con_prediccion = 0
+
+    for mensaje in mensajes:
+        for i, simbolo in enumerate(mensaje):
+            costo = 1 + vocabulario.posiciones.get(simbolo, (None, 0))[1]
+            sin_prediccion += costo
+            con_prediccion += 1 if simbolo in predictor.sugerir(mensaje[:i]) else costo
+        # Hablar el mensaje también es una selección
+        sin_prediccion += 1
+        con_prediccion += 1
+        predictor.aprender(mensaje)
+
+    if mensajes:
+        print(f"📊 {len(mensajes)} mensajes: {sin_prediccion / len(mensajes):.2f} selecciones por mensaje "
+              f"sin sugerencias, {con_prediccion / len(mensajes):.2f} con sugerencias")
+    return sin_prediccion, con_prediccion
+
+
+if __name__ == "__main__":
+    from Vocabulario import Vocabulario
+
+    evaluar(sys.argv[1] if len(sys.argv) > 1 else "historial_mensajes.txt", Vocabulario())
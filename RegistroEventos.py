@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import time
+import queue
+import threading
+from collections import Counter
+
+
+class RegistroEventos:
+    """Registro de uso para revisión clínica, escrito por lotes en un hilo aparte
+
+    registrar() sólo encola el evento; el hilo escritor agrupa los eventos y los
+    añade a un archivo JSON Lines que rota al superar tamaño_maximo bytes.
+    """
+
+    def __init__(self, ruta="registros/eventos.jsonl", tamaño_lote=64, intervalo=2.0,
+                 tamaño_maximo=5 * 1024 * 1024, respaldos=10):
+        self.ruta = ruta
+        self.tamaño_lote = tamaño_lote
+        self.intervalo = intervalo
+        self.tamaño_maximo = tamaño_maximo
+        self.respaldos = respaldos
+
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+        self.cola = queue.SimpleQueue()
+        self.hilo = threading.Thread(target=self._escribir_en_fondo, daemon=True)
+        self.hilo.start()
+
+    def registrar(self, tipo, **datos):
+        """Encola un evento; nunca toca el sistema de archivos en el hilo que llama"""
+        datos["t"] = time.time()
+        datos["tipo"] = tipo
+        self.cola.put(datos)
+
+    def cerrar(self):
+        """Escribe los eventos pendientes y detiene el hilo escritor"""
+        self.cola.put(None)
+        self.hilo.join(timeout=5)
+
+    def _rotar(self):
+        for i in range(self.respaldos - 1, 0, -1):
+            origen = f"{self.ruta}.{i}"
+            if os.path.exists(origen):
+                os.replace(origen, f"{self.ruta}.{i + 1}")
+        os.replace(self.ruta, f"{self.ruta}.1")
+
+    def _escribir(self, lote):
+        try:
+            with open(self.ruta, "a", encoding="utf-8") as archivo:
+                archivo.write("".join(json.dumps(evento, ensure_ascii=False) + "\n" for evento in lote))
+                tamaño = archivo.tell()
+            if tamaño > self.tamaño_maximo:
+                self._rotar()
+        except OSError as e:
+            print(f"⚠️ No se pudo escribir el registro de eventos: {e}")
+
+    def _escribir_en_fondo(self):
+        terminado = False
+        while not terminado:
+            lote = []
+            limite = time.monotonic() + self.intervalo
+            while len(lote) < self.tamaño_lote:
+                try:
+                    evento = self.cola.get(timeout=max(0.0, limite - time.monotonic()))
+                except queue.Empty:
+                    break
+                if evento is None:
+                    terminado = True
+                    break
+                lote.append(evento)
+            if lote:
+                self._escribir(lote)
+
+
+def leer_eventos(ruta="registros/eventos.jsonl"):
+    """Lee el registro completo, incluidos los archivos rotados, en orden cronológico"""
+    rutas = []
+    i = 1
+    while os.path.exists(f"{ruta}.{i}"):
+        rutas.append(f"{ruta}.{i}")
+        i += 1
+    rutas = rutas[::-1] + ([ruta] if os.path.exists(ruta) else [])
+
+    eventos = []
+    for nombre in rutas:
+        with open(nombre, encoding="utf-8") as archivo:
+            for linea in archivo:
+                try:
+                    eventos.append(json.loads(linea))
+                except ValueError:
+                    continue  # Línea incompleta de un cierre abrupto
+    return eventos
+
+
+def resumir(eventos, pausa_maxima=300):
+    """Selecciones por minuto y tiempo entre selecciones (se ignoran pausas largas)"""
+    selecciones = [e for e in eventos if e["tipo"] == "seleccion"]
+    tiempos_seleccion = [b["t"] - a["t"] for a, b in zip(selecciones, selecciones[1:])
+                         if b["t"] - a["t"] <= pausa_maxima]
+
+    # Tiempo activo: suma de los intervalos entre selecciones sin pausas largas
+    tiempo_activo = sum(tiempos_seleccion)
+    resumen = {
+        "eventos": Counter(e["tipo"] for e in eventos),
+        "selecciones": len(selecciones),
+        "selecciones_por_minuto": 60 * len(tiempos_seleccion) / tiempo_activo if tiempo_activo else 0.0,
+        "tiempo_medio_seleccion": tiempo_activo / len(tiempos_seleccion) if tiempos_seleccion else 0.0,
+        "simbolos_frecuentes": Counter(e.get("simbolo") for e in selecciones).most_common(10),
+    }
+    return resumen
+
+
+def main():
+    ruta = sys.argv[1] if len(sys.argv) > 1 else "registros/eventos.jsonl"
+    eventos = leer_eventos(ruta)
+    if not eventos:
+        print(f"⚠️ No hay eventos en {ruta}")
+        return
+
+    resumen = resumir(eventos)
+    inicio = time.strftime("%Y-%m-%d %H:%M", time.localtime(eventos[0]["t"]))
+    fin = time.strftime("%Y-%m-%d %H:%M", time.localtime(eventos[-1]["t"]))
+    print(f"📋 Registro {inicio} - {fin}: {len(eventos)} eventos")
+    for tipo, cantidad in resumen["eventos"].most_common():
+        print(f"   {tipo}: {cantidad}")
+    print(f"📊 Selecciones: {resumen['selecciones']}, {resumen['selecciones_por_minuto']:.1f} por minuto")
+    print(f"⏱️ Tiempo medio entre selecciones: {resumen['tiempo_medio_seleccion']:.1f} s")
+    print("Símbolos más usados: " + ", ".join(f"{s} ({n})" for s, n in resumen["simbolos_frecuentes"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,547 @@
+import os
+import time
+import socket
+import struct
+import argparse
+import threading
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+
+
+RUTA_SOCKET = "/tmp/simus_inferencia.sock"
+
+MODO_MANOS = 0
+MODO_ROSTRO = 1
+
+ESTADO_OK = 0
+ESTADO_DESCARTADO = 1
+ESTADO_ERROR = 2
+
+# Solicitud: modo, alto, ancho, marca de tiempo, longitud del nombre de memoria compartida
+CABECERA_SOLICITUD = struct.Struct("!BIIdH")
+# Respuesta: estado, número de puntos (cada punto son 3 float32: x, y, z)
+CABECERA_RESPUESTA = struct.Struct("!BI")
+
+# Resultado de ClienteInferencia.procesar para un marco descartado por latencia
+DESCARTADO = object()
+
+
+def _recibir_exacto(conexion, n):
+    """Lee exactamente n bytes del socket o None si se cerró la conexión"""
+    datos = bytearray()
+    while len(datos) < n:
+        parte = conexion.recv(n - len(datos))
+        if not parte:
+            return None
+        datos.extend(parte)
+    return bytes(datos)
+
+
+def _abrir_memoria(nombre):
+    """Abre una memoria compartida creada por otro proceso sin adueñarse de ella"""
+    memoria = shared_memory.SharedMemory(name=nombre)
+    # El cliente es el dueño: evitar que el resource_tracker la borre al salir
+    try:
+        resource_tracker.unregister(memoria._name, "shared_memory")
+    except Exception:
+        pass
+    return memoria
+
+
+# ---------------------------------------------------------------------------
+# Proceso trabajador
+# ---------------------------------------------------------------------------
+
+_mp = None
+_modelos = {}
+_memorias = {}  # id_cliente -> (nombre, memoria compartida abierta)
+
+
+def _inicializar_trabajador():
+    """Importa MediaPipe una sola vez por proceso trabajador"""
+    global _mp
+    import mediapipe as mp
+
+    _mp = mp
+
+
+def _modelo(id_cliente, modo):
+    """Modelo propio de cada cliente: el seguimiento de vídeo guarda estado entre marcos"""
+    clave = (id_cliente, modo)
+    if clave not in _modelos:
+        if modo == MODO_MANOS:
+            _modelos[clave] = _mp.solutions.hands.Hands(
+                max_num_hands=1,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.7
+            )
+        else:
+            _modelos[clave] = _mp.solutions.face_mesh.FaceMesh(
+                max_num_faces=1,
+                refine_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5
+            )
+    return _modelos[clave]
+
+
+def _preparar_cliente(id_cliente):
+    """Crea los modelos del cliente al conectarse, antes de su primer marco"""
+    _modelo(id_cliente, MODO_MANOS)
+    _modelo(id_cliente, MODO_ROSTRO)
+
+
+def _cerrar_memoria(id_cliente):
+    nombre_memoria = _memorias.pop(id_cliente, None)
+    if nombre_memoria is not None:
+        try:
+            nombre_memoria[1].close()
+        except BufferError:
+            pass
+
+
+def _olvidar_cliente(id_cliente):
+    """Cierra los modelos y la memoria compartida de un cliente desconectado"""
+    for clave in [clave for clave in _modelos if clave[0] == id_cliente]:
+        _modelos.pop(clave).close()
+    _cerrar_memoria(id_cliente)
+
+
+def _procesar_marco(id_cliente, nombre_memoria, alto, ancho, modo):
+    """Ejecuta el modelo del cliente sobre el marco RGB que está en memoria compartida"""
+    abierta = _memorias.get(id_cliente)
+    if abierta is None or abierta[0] != nombre_memoria:
+        # El cliente creó otro segmento (p. ej. cambió la resolución): soltar el anterior
+        _cerrar_memoria(id_cliente)
+        abierta = (nombre_memoria, _abrir_memoria(nombre_memoria))
+        _memorias[id_cliente] = abierta
+    memoria = abierta[1]
+
+    marco_rgb = np.ndarray((alto, ancho, 3), dtype=np.uint8, buffer=memoria.buf)
+    marco_rgb.flags.writeable = False
+    resultados = _modelo(id_cliente, modo).process(marco_rgb)
+
+    if modo == MODO_MANOS:
+        detectados = resultados.multi_hand_landmarks
+    else:
+        detectados = resultados.multi_face_landmarks
+
+    if not detectados:
+        return b""
+
+    puntos = detectados[0].landmark
+    return np.array([(p.x, p.y, p.z) for p in puntos], dtype=np.float32).tobytes()
+
+
+# ---------------------------------------------------------------------------
+# Servidor
+# ---------------------------------------------------------------------------
+
+class _Solicitud:
+    __slots__ = ("modo", "alto", "ancho", "marca_tiempo", "nombre_memoria")
+
+    def __init__(self, modo, alto, ancho, marca_tiempo, nombre_memoria):
+        self.modo = modo
+        self.alto = alto
+        self.ancho = ancho
+        self.marca_tiempo = marca_tiempo
+        self.nombre_memoria = nombre_memoria
+
+
+class _Cliente:
+    """Estado de una estación conectada al servidor"""
+
+    def __init__(self, id_cliente, conexion, trabajador):
+        self.id = id_cliente
+        self.conexion = conexion
+        self.trabajador = trabajador
+        self.bloqueo_envio = threading.Lock()
+        self.pendiente = None
+        self.procesados = 0
+        self.descartados = 0
+        self.latencia_total = 0.0
+
+    def responder(self, estado, datos=b""):
+        n_puntos = len(datos) // 12
+        with self.bloqueo_envio:
+            try:
+                self.conexion.sendall(CABECERA_RESPUESTA.pack(estado, n_puntos) + datos)
+            except OSError:
+                pass
+
+
+class ServidorInferencia:
+    """Servicio local de inferencia compartido por varias estaciones SIMUS
+
+    Cada cliente queda fijo en un proceso trabajador, que guarda modelos propios
+    para ese cliente: el seguimiento de MediaPipe en modo vídeo usa los puntos del
+    marco anterior y no debe mezclar marcos de distintas estaciones.
+    """
+
+    def __init__(self, ruta_socket=RUTA_SOCKET, num_trabajadores=None, presupuesto_latencia=0.15,
+                 tiempo_maximo_trabajo=2.0):
+        self.ruta_socket = ruta_socket
+        self.num_trabajadores = num_trabajadores or os.cpu_count() or 1
+        self.presupuesto_latencia = presupuesto_latencia
+        self.tiempo_maximo_trabajo = tiempo_maximo_trabajo
+
+        self.clientes = {}
+        self.siguiente_id = 0
+        self.turno = 0
+        self.condicion = threading.Condition()
+        # Por trabajador: (inicio, cliente) del marco en curso o None, y generación
+        # para ignorar respuestas tardías de un marco que ya se dio por perdido
+        self.en_curso = [None] * self.num_trabajadores
+        self.generaciones = [0] * self.num_trabajadores
+        self.ejecutando = False
+        self.tiempo_inicio = 0
+
+        self.trabajadores = []
+        self.servidor = None
+
+    def iniciar(self):
+        """Crea los procesos trabajadores y empieza a aceptar clientes"""
+        # Los pools se crean antes que los hilos para que el fork sea limpio
+        self.trabajadores = [multiprocessing.Pool(1, initializer=_inicializar_trabajador)
+                             for _ in range(self.num_trabajadores)]
+
+        if os.path.exists(self.ruta_socket):
+            os.unlink(self.ruta_socket)
+        self.servidor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.servidor.bind(self.ruta_socket)
+        self.servidor.listen()
+
+        self.ejecutando = True
+        self.tiempo_inicio = time.time()
+        threading.Thread(target=self._aceptar_clientes, daemon=True).start()
+        threading.Thread(target=self._despachar, daemon=True).start()
+        print(f"✅ Servidor de inferencia en {self.ruta_socket} con {self.num_trabajadores} trabajadores")
+
+    def detener(self):
+        """Detiene el servidor y libera el pool"""
+        self.ejecutando = False
+        with self.condicion:
+            self.condicion.notify_all()
+        if self.servidor:
+            self.servidor.close()
+        if os.path.exists(self.ruta_socket):
+            os.unlink(self.ruta_socket)
+        for trabajador in self.trabajadores:
+            trabajador.terminate()
+            trabajador.join()
+
+    def _aceptar_clientes(self):
+        while self.ejecutando:
+            try:
+                conexion, _ = self.servidor.accept()
+            except OSError:
+                break
+            with self.condicion:
+                # Asignar el trabajador con menos clientes
+                carga = [0] * self.num_trabajadores
+                for otro in self.clientes.values():
+                    carga[otro.trabajador] += 1
+                cliente = _Cliente(self.siguiente_id, conexion, carga.index(min(carga)))
+                self.clientes[cliente.id] = cliente
+                self.siguiente_id += 1
+            print(f"🔌 Cliente {cliente.id} conectado al trabajador {cliente.trabajador}")
+            threading.Thread(target=self._leer_cliente, args=(cliente,), daemon=True).start()
+
+            # Cargar sus modelos ya; el cliente espera este aviso antes de enviar marcos
+            self.trabajadores[cliente.trabajador].apply_async(
+                _preparar_cliente, (cliente.id,),
+                callback=lambda _, c=cliente: c.responder(ESTADO_OK),
+                error_callback=lambda error, c=cliente: self._fallar_preparacion(c, error)
+            )
+
+    def _fallar_preparacion(self, cliente, error):
+        print(f"Error al preparar los modelos del cliente {cliente.id}: {error}")
+        cliente.responder(ESTADO_ERROR)
+
+    def _leer_cliente(self, cliente):
+        """Recibe solicitudes de un cliente; sólo se conserva la más reciente"""
+        while self.ejecutando:
+            try:
+                cabecera = _recibir_exacto(cliente.conexion, CABECERA_SOLICITUD.size)
+                if cabecera is None:
+                    break
+                modo, alto, ancho, marca_tiempo, largo_nombre = CABECERA_SOLICITUD.unpack(cabecera)
+                nombre = _recibir_exacto(cliente.conexion, largo_nombre)
+                if nombre is None:
+                    break
+            except OSError:
+                # El cliente cerró con una respuesta sin leer (p. ej. tras agotar su espera)
+                break
+
+            solicitud = _Solicitud(modo, alto, ancho, marca_tiempo, nombre.decode())
+            with self.condicion:
+                if cliente.pendiente is not None:
+                    # Un marco nuevo reemplaza al anterior que aún no se despachó
+                    cliente.descartados += 1
+                    cliente.responder(ESTADO_DESCARTADO)
+                cliente.pendiente = solicitud
+                self.condicion.notify()
+
+        with self.condicion:
+            self.clientes.pop(cliente.id, None)
+        cliente.conexion.close()
+        if self.ejecutando:
+            self.trabajadores[cliente.trabajador].apply_async(_olvidar_cliente, (cliente.id,))
+        print(f"🔌 Cliente {cliente.id} desconectado")
+
+    def _siguiente_solicitud(self):
+        """Elige la próxima solicitud en turno rotativo entre clientes con trabajador libre"""
+        ids = sorted(self.clientes)
+        for i in range(len(ids)):
+            cliente = self.clientes[ids[(self.turno + i) % len(ids)]]
+            if cliente.pendiente is not None and self.en_curso[cliente.trabajador] is None:
+                self.turno = (self.turno + i + 1) % len(ids)
+                solicitud = cliente.pendiente
+                cliente.pendiente = None
+                return cliente, solicitud
+        return None, None
+
+    def _revisar_trabajadores(self):
+        """Da por perdido un marco que no terminó a tiempo (p. ej. el trabajador murió)"""
+        ahora = time.time()
+        for i, en_curso in enumerate(self.en_curso):
+            if en_curso is not None and ahora - en_curso[0] > self.tiempo_maximo_trabajo:
+                self.en_curso[i] = None
+                self.generaciones[i] += 1
+                print(f"⚠️ El trabajador {i} no respondió a tiempo")
+                en_curso[1].responder(ESTADO_ERROR)
+
+    def _despachar(self):
+        while self.ejecutando:
+            with self.condicion:
+                self._revisar_trabajadores()
+                cliente, solicitud = self._siguiente_solicitud()
+                while cliente is None and self.ejecutando:
+                    self.condicion.wait(timeout=0.5)
+                    self._revisar_trabajadores()
+                    cliente, solicitud = self._siguiente_solicitud()
+                if not self.ejecutando:
+                    break
+
+                # Descartar marcos que ya superaron el presupuesto de latencia
+                if time.time() - solicitud.marca_tiempo > self.presupuesto_latencia:
+                    cliente.descartados += 1
+                    cliente.responder(ESTADO_DESCARTADO)
+                    continue
+
+                i = cliente.trabajador
+                self.en_curso[i] = (time.time(), cliente)
+                generacion = self.generaciones[i]
+
+            self.trabajadores[i].apply_async(
+                _procesar_marco,
+                (cliente.id, solicitud.nombre_memoria, solicitud.alto, solicitud.ancho, solicitud.modo),
+                callback=lambda datos, c=cliente, s=solicitud, i=i, g=generacion: self._completar(c, s, i, g, datos),
+                error_callback=lambda error, c=cliente, i=i, g=generacion: self._fallar(c, i, g, error)
+            )
+
+    def _liberar_trabajador(self, i, generacion):
+        """Marca libre al trabajador; False si su marco ya se había dado por perdido"""
+        with self.condicion:
+            if self.generaciones[i] != generacion:
+                return False
+            self.en_curso[i] = None
+            self.condicion.notify()
+            return True
+
+    def _completar(self, cliente, solicitud, i, generacion, datos):
+        if not self._liberar_trabajador(i, generacion):
+            return
+        cliente.procesados += 1
+        cliente.latencia_total += time.time() - solicitud.marca_tiempo
+        cliente.responder(ESTADO_OK, datos)
+
+    def _fallar(self, cliente, i, generacion, error):
+        if not self._liberar_trabajador(i, generacion):
+            return
+        print(f"Error de inferencia para cliente {cliente.id}: {error}")
+        cliente.responder(ESTADO_ERROR)
+
+    def metricas(self):
+        """Devuelve rendimiento, descartes y latencia media por cliente"""
+        transcurrido = max(time.time() - self.tiempo_inicio, 1e-6)
+        with self.condicion:
+            clientes = list(self.clientes.values())
+        return {
+            cliente.id: {
+                "procesados": cliente.procesados,
+                "descartados": cliente.descartados,
+                "marcos_por_segundo": cliente.procesados / transcurrido,
+                "latencia_media_ms": 1000 * cliente.latencia_total / cliente.procesados if cliente.procesados else 0.0,
+            }
+            for cliente in clientes
+        }
+
+
+# ---------------------------------------------------------------------------
+# Cliente
+# ---------------------------------------------------------------------------
+
+class _Punto:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class _Landmarks:
+    """Imita la estructura de landmarks de MediaPipe (landmarks.landmark[i].x)"""
+
+    def __init__(self, puntos):
+        self.landmark = [_Punto(float(x), float(y), float(z)) for x, y, z in puntos]
+
+
+class _Resultados:
+    def __init__(self, landmarks=None, descartado=False):
+        lista = [landmarks] if landmarks is not None else None
+        self.multi_hand_landmarks = lista
+        self.multi_face_landmarks = lista
+        # Marco descartado por el presupuesto de latencia: no significa que no haya mano o rostro
+        self.descartado = descartado
+
+
+class _ModeloRemoto:
+    """Sustituto de Hands/FaceMesh que delega en el servidor de inferencia"""
+
+    def __init__(self, cliente, modo):
+        self.cliente = cliente
+        self.modo = modo
+
+    def process(self, marco_rgb):
+        try:
+            puntos = self.cliente.procesar(marco_rgb, self.modo)
+        except TimeoutError as e:
+            # El marco se perdió pero el cliente se reconecta: tratarlo como descartado
+            print(f"⚠️ {e}")
+            return _Resultados(descartado=True)
+        if puntos is DESCARTADO:
+            return _Resultados(descartado=True)
+        return _Resultados(_Landmarks(puntos) if puntos is not None else None)
+
+    def close(self):
+        # El cliente compartido se cierra desde ManejoCamara
+        pass
+
+
+class ClienteInferencia:
+    """Conexión de una estación al servidor de inferencia
+
+    Al conectarse espera hasta tiempo_preparacion a que el servidor cargue sus
+    modelos. Si un marco no llega en tiempo_espera la conexión se descarta (una
+    respuesta tardía desordenaría el protocolo) y el siguiente marco reconecta.
+    Los errores de conexión se propagan como OSError.
+    """
+
+    def __init__(self, ruta_socket=RUTA_SOCKET, tiempo_espera=1.0, tiempo_preparacion=30.0):
+        self.ruta_socket = ruta_socket
+        self.tiempo_espera = tiempo_espera
+        self.tiempo_preparacion = tiempo_preparacion
+        self.conexion = None
+        self.memoria = None
+        self._conectar()
+
+    def _conectar(self):
+        conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conexion.connect(self.ruta_socket)
+            conexion.settimeout(self.tiempo_preparacion)
+            respuesta = _recibir_exacto(conexion, CABECERA_RESPUESTA.size)
+            if respuesta is None or CABECERA_RESPUESTA.unpack(respuesta)[0] != ESTADO_OK:
+                raise ConnectionError("El servidor de inferencia no pudo preparar los modelos")
+        except OSError:
+            conexion.close()
+            raise
+        conexion.settimeout(self.tiempo_espera)
+        self.conexion = conexion
+
+    def _desconectar(self):
+        if self.conexion is not None:
+            self.conexion.close()
+            self.conexion = None
+
+    def modelo(self, modo):
+        return _ModeloRemoto(self, modo)
+
+    def _preparar_memoria(self, tamaño):
+        if self.memoria is not None and self.memoria.size >= tamaño:
+            return
+        self._liberar_memoria()
+        self.memoria = shared_memory.SharedMemory(create=True, size=tamaño)
+
+    def procesar(self, marco_rgb, modo):
+        """Envía un marco RGB y devuelve un arreglo (n, 3) de landmarks, None o DESCARTADO"""
+        alto, ancho = marco_rgb.shape[:2]
+        self._preparar_memoria(marco_rgb.nbytes)
+        destino = np.ndarray(marco_rgb.shape, dtype=np.uint8, buffer=self.memoria.buf)
+        np.copyto(destino, marco_rgb)
+
+        if self.conexion is None:
+            self._conectar()
+
+        nombre = self.memoria.name.encode()
+        cabecera = CABECERA_SOLICITUD.pack(modo, alto, ancho, time.time(), len(nombre))
+        try:
+            self.conexion.sendall(cabecera + nombre)
+            respuesta = _recibir_exacto(self.conexion, CABECERA_RESPUESTA.size)
+            if respuesta is None:
+                raise ConnectionError("El servidor de inferencia cerró la conexión")
+            estado, n_puntos = CABECERA_RESPUESTA.unpack(respuesta)
+            datos = _recibir_exacto(self.conexion, n_puntos * 12) if n_puntos else b""
+        except socket.timeout:
+            # Una respuesta tardía desordenaría el protocolo: reconectar en el próximo marco
+            self._desconectar()
+            raise TimeoutError(f"El servidor de inferencia no respondió en {self.tiempo_espera} s")
+        except OSError:
+            self._desconectar()
+            raise
+
+        if estado == ESTADO_DESCARTADO:
+            return DESCARTADO
+        if estado != ESTADO_OK or not n_puntos:
+            return None
+        return np.frombuffer(datos, dtype=np.float32).reshape(n_puntos, 3)
+
+    def _liberar_memoria(self):
+        if self.memoria is not None:
+            self.memoria.close()
+            self.memoria.unlink()
+            self.memoria = None
+
+    def cerrar(self):
+        self._liberar_memoria()
+        self._desconectar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de inferencia compartido para estaciones SIMUS")
+    parser.add_argument("--socket", default=RUTA_SOCKET)
+    parser.add_argument("--trabajadores", type=int, default=None)
+    parser.add_argument("--presupuesto", type=float, default=0.15, help="Latencia máxima en segundos")
+    args = parser.parse_args()
+
+    servidor = ServidorInferencia(args.socket, args.trabajadores, args.presupuesto)
+    servidor.iniciar()
+
+    try:
+        while True:
+            time.sleep(10)
+            for id_cliente, datos in servidor.metricas().items():
+                print(f"📊 Cliente {id_cliente}: {datos['marcos_por_segundo']:.1f} FPS, "
+                      f"latencia {datos['latencia_media_ms']:.1f} ms, descartados {datos['descartados']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.detener()
+        print("👋 Servidor detenido")
+
+
+if __name__ == "__main__":
+    main()
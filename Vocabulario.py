@@ -0,0 +1,163 @@
+import os
+import json
+import queue
+import threading
+from collections import OrderedDict
+import pygame
+
+
+CARPETA_ICONOS = "img"
+TAMANO_ICONO = (70, 70)
+
+
+def crear_icono(archivo, tamaño=TAMANO_ICONO, carpeta=CARPETA_ICONOS):
+    """Carga y escala un icono; devuelve un marcador de posición si falta o falla"""
+    try:
+        ruta = os.path.join(carpeta, archivo)
+        if os.path.exists(ruta):
+            return pygame.transform.scale(pygame.image.load(ruta), tamaño)
+        color = (100, 100, 200)
+    except Exception as e:
+        print(f"Error cargando icono {archivo}: {e}")
+        color = (200, 100, 100)
+
+    # Crear placeholder si no existe la imagen o hubo un error
+    superficie = pygame.Surface(tamaño, pygame.SRCALPHA)
+    pygame.draw.circle(superficie, color, (tamaño[0] // 2, tamaño[1] // 2), min(tamaño) // 2 - 5)
+    return superficie
+
+
+class CacheIconos:
+    """Caché LRU de iconos decodificados y escalados, limitada por memoria, con precarga en segundo plano
+
+    Cada icono se escala una sola vez por tamaño: la clave es (archivo, tamaño).
+    """
+
+    def __init__(self, limite_bytes=64 * 1024 * 1024, tamaño=TAMANO_ICONO, carpeta=CARPETA_ICONOS):
+        self.limite_bytes = limite_bytes
+        self.tamaño = tamaño
+        self.carpeta = carpeta
+
+        self.superficies = OrderedDict()
+        self.bytes_usados = 0
+        self.bloqueo = threading.Lock()
+
+        self.cola_precarga = queue.Queue()
+        self.hilo = threading.Thread(target=self._precargar_en_fondo, daemon=True)
+        self.hilo.start()
+
+    @staticmethod
+    def _tamaño_bytes(superficie):
+        return superficie.get_width() * superficie.get_height() * superficie.get_bytesize()
+
+    def _insertar(self, clave, superficie):
+        with self.bloqueo:
+            if clave in self.superficies:
+                self.superficies.move_to_end(clave)
+                return self.superficies[clave]
+
+            self.superficies[clave] = superficie
+            self.bytes_usados += self._tamaño_bytes(superficie)
+
+            # Expulsar los iconos menos usados recientemente
+            while self.bytes_usados > self.limite_bytes and len(self.superficies) > 1:
+                _, expulsada = self.superficies.popitem(last=False)
+                self.bytes_usados -= self._tamaño_bytes(expulsada)
+            return superficie
+
+    def obtener(self, archivo, tamaño=None):
+        """Devuelve el icono decodificado, cargándolo si no está en caché"""
+        clave = (archivo, tuple(tamaño or self.tamaño))
+        with self.bloqueo:
+            superficie = self.superficies.get(clave)
+            if superficie is not None:
+                self.superficies.move_to_end(clave)
+                return superficie
+
+        # Decodificar fuera del bloqueo para no frenar al hilo de precarga
+        return self._insertar(clave, crear_icono(archivo, clave[1], self.carpeta))
+
+    def precargar(self, archivos, tamaño=None):
+        """Encola archivos para decodificarlos en segundo plano"""
+        for archivo in archivos:
+            self.cola_precarga.put((archivo, tuple(tamaño or self.tamaño)))
+
+    def detener(self):
+        """Detiene el hilo de precarga y suelta los iconos en caché"""
+        self.cola_precarga.put(None)
+        self.hilo.join(timeout=1)
+        with self.bloqueo:
+            self.superficies.clear()
+            self.bytes_usados = 0
+
+    def _precargar_en_fondo(self):
+        while True:
+            clave = self.cola_precarga.get()
+            if clave is None:
+                break
+            with self.bloqueo:
+                presente = clave in self.superficies
+            if not presente:
+                self._insertar(clave, crear_icono(clave[0], clave[1], self.carpeta))
+
+
+class Vocabulario:
+    """Vocabulario de pictogramas (categorías -> páginas -> celdas) cargado desde un archivo JSON"""
+
+    def __init__(self, ruta="vocabulario.json", cache=None):
+        with open(ruta, encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+
+        self.celdas_por_pagina = datos.get("celdas_por_pagina", 6)
+        self.categorias = []
+        for categoria in datos["categorias"]:
+            simbolos = categoria["simbolos"]
+            paginas = [simbolos[i:i + self.celdas_por_pagina]
+                       for i in range(0, len(simbolos), self.celdas_por_pagina)] or [[]]
+            self.categorias.append({
+                "nombre": categoria["nombre"],
+                "titulo": categoria.get("titulo", categoria["nombre"].upper()),
+                "color": pygame.Color(categoria.get("color", "#ffffff")),
+                "paginas": paginas,
+            })
+
+        self.indice = {categoria["nombre"]: categoria for categoria in self.categorias}
+        # Índice de símbolos por nombre con su categoría y número de página
+        self.simbolos = {}
+        self.posiciones = {}
+        for categoria in self.categorias:
+            for numero, pagina in enumerate(categoria["paginas"]):
+                for celda in pagina:
+                    self.simbolos.setdefault(celda["nombre"], celda)
+                    self.posiciones.setdefault(celda["nombre"], (categoria["nombre"], numero))
+        self.pagina_actual = {categoria["nombre"]: 0 for categoria in self.categorias}
+        self.cache = cache if cache else CacheIconos()
+
+        for categoria in self.categorias:
+            self.precargar_vecinas(categoria["nombre"])
+
+    def cerrar(self):
+        self.cache.detener()
+
+    def numero_paginas(self, nombre_categoria):
+        return len(self.indice[nombre_categoria]["paginas"])
+
+    def pagina(self, nombre_categoria, desplazamiento=0):
+        """Devuelve las celdas de la página actual (o de una vecina) de la categoría"""
+        paginas = self.indice[nombre_categoria]["paginas"]
+        return paginas[(self.pagina_actual[nombre_categoria] + desplazamiento) % len(paginas)]
+
+    def cambiar_pagina(self, nombre_categoria, paso):
+        """Avanza o retrocede de página y precarga las páginas vecinas de la nueva"""
+        total = self.numero_paginas(nombre_categoria)
+        self.pagina_actual[nombre_categoria] = (self.pagina_actual[nombre_categoria] + paso) % total
+        self.precargar_vecinas(nombre_categoria)
+        return self.pagina(nombre_categoria)
+
+    def precargar_vecinas(self, nombre_categoria):
+        archivos = [celda["archivo"] for desplazamiento in (0, 1, -1)
+                    for celda in self.pagina(nombre_categoria, desplazamiento)]
+        self.cache.precargar(archivos)
+
+    def icono(self, celda, tamaño=None):
+        return self.cache.obtener(celda["archivo"], tamaño)